@@ -4,18 +4,33 @@
 =========================================
 A beautiful GUI admin panel for managing trips.
 Run: python3 trip-manager.py
+CI:  python3 trip-manager.py --check-pages  (are committed trip pages current?)
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, colorchooser
+import hashlib
+import html
 import json
 import re
 import os
+import queue
 import shutil
+import sqlite3
 import calendar
+import email.utils
+import gzip
+import http.server
 import subprocess
+import sys
 import threading
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
+
+try:
+    import brotli  # Optional: preview serves br when installed, gzip otherwise
+except ImportError:
+    brotli = None
 
 # Configuration
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -23,6 +38,33 @@ PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 TRIPS_DATA_FILE = os.path.join(PROJECT_ROOT, "js", "trips-data.js")
 FEATURED_TRIPS_FILE = os.path.join(PROJECT_ROOT, "js", "featured-trips.js")
 IMAGES_DIR = os.path.join(PROJECT_ROOT, "images", "trips")
+IMAGES_ROOT = os.path.join(PROJECT_ROOT, "images")
+GITATTRIBUTES_FILE = os.path.join(PROJECT_ROOT, ".gitattributes")
+TRIP_DETAIL_TEMPLATE = os.path.join(PROJECT_ROOT, "trip-detail.html")
+CNAME_FILE = os.path.join(PROJECT_ROOT, "CNAME")
+
+# Pre-rendered trip pages (trips/<id>/index.html) and the hashes they were built from
+TRIP_PAGES_DIR = os.path.join(PROJECT_ROOT, "trips")
+TRIP_PAGES_MANIFEST = os.path.join(TRIP_PAGES_DIR, ".build-manifest.json")
+TRIPS_SCRIPT_RE = re.compile(r'(js/trips-data\.js)(\?v=\d+)?')
+
+# Optional SQLite catalog (kept out of git); trips-data.js is generated from it on save
+TRIP_STORE_FILE = os.path.join(SCRIPT_DIR, "trips.db")
+
+# JSON data feed for the site and the Android app: full database, manifest and per-trip files
+TRIP_DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+TRIP_DATA_FILE = os.path.join(TRIP_DATA_DIR, "trips.json")
+TRIP_DATA_MANIFEST = os.path.join(TRIP_DATA_DIR, "manifest.json")
+TRIP_DATA_TRIPS_DIR = os.path.join(TRIP_DATA_DIR, "trips")
+TRIP_DATA_HASH_LENGTH = 12
+
+# Image types routed through Git LFS once it is enabled from the Photo Manager
+LFS_IMAGE_PATTERNS = [
+    'images/**/*.jpg',
+    'images/**/*.jpeg',
+    'images/**/*.png',
+    'images/**/*.webp',
+]
 
 # HTML files that load trips-data.js (for cache-busting)
 HTML_FILES = [
@@ -32,6 +74,69 @@ HTML_FILES = [
     os.path.join(PROJECT_ROOT, "checkout.html"),
 ]
 
+# Paths the Trip Manager writes; only these are staged when deploying
+MANAGED_PATHS = (
+    'js/trips-data.js',
+    'js/trips-data.js.backup',
+    'js/featured-trips.js',
+    'images/',
+    'trips/',
+    'data/',
+    '.gitattributes',
+) + tuple(os.path.basename(f) for f in HTML_FILES)
+
+# Saves queued for deploy within this many seconds of each other go out as one commit
+DEPLOY_DEBOUNCE_SECONDS = 5
+
+# Fields every trip needs before it can be deployed
+REQUIRED_TRIP_FIELDS = ('title', 'location', 'price', 'image', 'duration', 'difficulty')
+
+# Month names accepted in availableDates (same grammar as js/trip-date-utils.js)
+MONTHS = {
+    'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3,
+    'apr': 4, 'april': 4, 'may': 5, 'jun': 6, 'june': 6, 'jul': 7, 'july': 7,
+    'aug': 8, 'august': 8, 'sep': 9, 'sept': 9, 'september': 9,
+    'oct': 10, 'october': 10, 'nov': 11, 'november': 11, 'dec': 12, 'december': 12,
+}
+
+# The site counts a batch as past once its end date is before today in India
+INDIA_TZ = timezone(timedelta(hours=5, minutes=30))
+
+# Difficulty labels in trips-data.js, easiest first (for the filter index)
+DIFFICULTY_RANKS = {
+    'easy': 1, 'easy-moderate': 2, 'moderate': 3, 'moderate-hard': 4,
+    'challenging': 5, 'hard': 5, 'difficult': 5,
+}
+
+# Local src/href references in HTML pages (query strings and fragments dropped)
+ASSET_REF_RE = re.compile(r'''(?:src|href)\s*=\s*["']([^"'#?]+)''')
+
+# Local preview server (next free port is used if this one is taken)
+PREVIEW_PORT = 8080
+
+# Preview pages reload themselves when watched files change (seconds between checks)
+LIVE_RELOAD_INTERVAL = 1.0
+LIVE_RELOAD_DATA_FILES = ('js/trips-data.js', 'js/featured-trips.js')
+LIVE_RELOAD_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.svg')
+LIVE_RELOAD_SNIPPET = b'<script src="/__livereload.js"></script>\n'
+
+# Non-text types the preview server compresses
+COMPRESSIBLE_TYPES = ('application/javascript', 'application/json', 'image/svg+xml', 'application/xml')
+
+# How often to check trips-data.js for edits made outside this app
+TRIPS_WATCH_INTERVAL_MS = 2000
+
+# One trip entry in the tripsData object, as written by generate_js_content
+TRIP_BLOCK_RE = re.compile(r'^    "?([A-Za-z0-9_-]+)"?: (\{\n.*?^    \})', re.M | re.S)
+
+# Undo history limits (oldest steps are dropped first)
+HISTORY_MAX_STEPS = 200
+HISTORY_MAX_BYTES = 5 * 1024 * 1024
+
+# Focused widgets that keep Ctrl+Z/Ctrl+Y for themselves, and the Shift bit of event.state
+TEXT_INPUT_WIDGETS = (tk.Entry, tk.Text, tk.Spinbox, ttk.Entry)
+SHIFT_MASK = 0x0001
+
 # Modern color scheme
 COLORS = {
     'bg': '#1a1a2e',
@@ -48,6 +153,1729 @@ COLORS = {
 }
 
 
+class GitStatus:
+    """Parsed result of a single `git status --porcelain=v2 -z --branch` call."""
+    
+    def __init__(self):
+        self.head = None
+        self.upstream = None
+        self.ahead = None
+        self.behind = None
+        self.changes = []  # (code, path) with code in 'M', 'A', 'D', 'R', 'U', '??'
+        self.elapsed = 0.0
+    
+    @classmethod
+    def read(cls, cwd=PROJECT_ROOT, timeout=60):
+        """Run git status once and parse it. Raises RuntimeError if git fails."""
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(['git', 'status', '--porcelain=v2', '-z', '--branch'],
+                                    capture_output=True, cwd=cwd, timeout=timeout)
+        except FileNotFoundError:
+            raise RuntimeError("Git not found")
+        except subprocess.TimeoutExpired:
+            raise RuntimeError("git status timed out")
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip())
+        
+        status = cls.parse(result.stdout.decode('utf-8', 'surrogateescape'))
+        status.elapsed = time.perf_counter() - start
+        return status
+    
+    @classmethod
+    def parse(cls, output):
+        """Parse NUL-separated porcelain v2 records."""
+        status = cls()
+        records = output.split('\0')
+        i = 0
+        while i < len(records):
+            record = records[i]
+            i += 1
+            if not record:
+                continue
+            
+            kind = record[0]
+            if kind == '#':
+                parts = record.split(' ')
+                if parts[1] == 'branch.head':
+                    status.head = parts[2]
+                elif parts[1] == 'branch.upstream':
+                    status.upstream = parts[2]
+                elif parts[1] == 'branch.ab':
+                    status.ahead = int(parts[2].lstrip('+'))
+                    status.behind = int(parts[3].lstrip('-'))
+            elif kind == '1':
+                fields = record.split(' ', 8)
+                status.changes.append((cls._code(fields[1]), fields[8]))
+            elif kind == '2':
+                fields = record.split(' ', 9)
+                status.changes.append(('R', fields[9]))
+                i += 1  # Skip the original path record
+            elif kind == 'u':
+                status.changes.append(('U', record.split(' ', 10)[10]))
+            elif kind == '?':
+                status.changes.append(('??', record[2:]))
+        return status
+    
+    @staticmethod
+    def _code(xy):
+        """Collapse the index/worktree pair into one code, preferring the index side."""
+        code = xy[0] if xy[0] != '.' else xy[1]
+        return code if code in ('A', 'D') else 'M'
+    
+    def split_changes(self):
+        """Return (added, modified, deleted) path lists."""
+        added, modified, deleted = [], [], []
+        for code, path in self.changes:
+            if code in ('A', '??'):
+                added.append(path)
+            elif code == 'D':
+                deleted.append(path)
+            else:
+                modified.append(path)
+        return added, modified, deleted
+    
+    def paths_to_stage(self, written_files):
+        """Changed paths the Trip Manager wrote, either this session or under MANAGED_PATHS."""
+        return [path for _, path in self.changes
+                if path in written_files or path.startswith(MANAGED_PATHS)]
+
+
+class GitRunner:
+    """Runs git commands in the project and records how long each one took."""
+    
+    def __init__(self):
+        self.timings = []
+    
+    def run(self, args, timeout=60):
+        """Run a git command and return (success, output, return code)."""
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(
+                ['git'] + args,
+                capture_output=True, text=True,
+                cwd=PROJECT_ROOT, timeout=timeout
+            )
+            output = (result.stdout + ' ' + result.stderr).strip()
+            success = result.returncode == 0
+            return success, output, result.returncode
+        except subprocess.TimeoutExpired:
+            return False, "Command timed out", -1
+        except FileNotFoundError:
+            return False, "Git not found", -1
+        except Exception as e:
+            return False, str(e), -1
+        finally:
+            self.timings.append((args[0], time.perf_counter() - start))
+    
+    def last_timing(self):
+        """Format the duration of the most recent git command."""
+        return f"({self.timings[-1][1]:.2f}s)" if self.timings else ""
+    
+    def summary(self, total_seconds):
+        """Time per git command (repeats added up) and the overall total, on one line."""
+        totals = {}
+        for name, secs in self.timings:
+            totals[name] = totals.get(name, 0) + secs
+        parts = [f"{name} {secs:.2f}s" for name, secs in totals.items()]
+        return f"⏱️ {' | '.join(parts)} | total {total_seconds:.2f}s"
+
+
+def build_commit_message(status):
+    """Build a descriptive commit message from parsed git status, or None if clean."""
+    if not status.changes:
+        return None
+    
+    added, modified, deleted = status.split_changes()
+    added = [os.path.basename(p.rstrip('/')) for p in added]
+    modified = [os.path.basename(p) for p in modified]
+    deleted = [os.path.basename(p) for p in deleted]
+    
+    # Build commit message
+    parts = []
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
+    
+    # Detect specific changes
+    trips_changed = any('trips-data' in f for f in modified + added)
+    featured_changed = any('featured-trips' in f for f in modified + added)
+    style_changed = any(f.endswith('.css') for f in modified + added)
+    html_changed = any(f.endswith('.html') for f in modified + added)
+    js_changed = any(f.endswith('.js') and 'trips-data' not in f and 'featured-trips' not in f 
+                    for f in modified + added)
+    
+    if trips_changed:
+        parts.append("Update trips data")
+    if featured_changed:
+        parts.append("Update featured trips")
+    if style_changed:
+        parts.append("Update styles")
+    if html_changed:
+        parts.append("Update pages")
+    if js_changed:
+        parts.append("Update scripts")
+    
+    if added:
+        parts.append(f"Add {len(added)} file(s)")
+    if deleted:
+        parts.append(f"Remove {len(deleted)} file(s)")
+    
+    if not parts:
+        parts.append(f"Update {len(status.changes)} file(s)")
+    
+    # Create summary
+    summary = " | ".join(parts[:3])  # Max 3 parts in summary
+    
+    # Create detailed message
+    details = []
+    if modified:
+        details.append(f"Modified: {', '.join(modified[:5])}")
+        if len(modified) > 5:
+            details.append(f"  ...and {len(modified) - 5} more")
+    if added:
+        details.append(f"Added: {', '.join(added[:3])}")
+    if deleted:
+        details.append(f"Deleted: {', '.join(deleted[:3])}")
+    
+    full_msg = f"{summary} [{timestamp}]"
+    if details:
+        full_msg += "\n\n" + "\n".join(details)
+    return full_msg
+
+
+def git_config_value(*args):
+    """Read a single git value (config, rev-parse, ...), or '' if unavailable."""
+    try:
+        result = subprocess.run(['git'] + list(args), capture_output=True, text=True,
+                                cwd=PROJECT_ROOT, timeout=15)
+        return result.stdout.strip() if result.returncode == 0 else ''
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return ''
+
+
+def fetch_args(remote='origin', branch='main', unshallow=False):
+    """Fetch only the deploy branch, keeping partial and shallow clones that way.
+    
+    Partial clones fetch commits and trees without image blobs. Shallow clones
+    stay shallow without a depth limit: the fetch stops at commits we already
+    have, so it never cuts history above the merge base with local commits.
+    Pass unshallow=True when the merge base is below the shallow boundary.
+    """
+    args = ['fetch', '--no-tags']
+    if (git_config_value('config', '--get', f'remote.{remote}.promisor') == 'true'
+            or git_config_value('config', '--get', 'extensions.partialClone')):
+        args.append('--filter=blob:none')
+    if unshallow and git_config_value('rev-parse', '--is-shallow-repository') == 'true':
+        args.append('--unshallow')
+    return args + [remote, f'+refs/heads/{branch}:refs/remotes/{remote}/{branch}']
+
+
+def format_size(num_bytes):
+    """Human readable file size."""
+    for unit in ('B', 'KB', 'MB'):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}" if unit == 'B' else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+def lfs_available():
+    """Check whether the git-lfs extension is installed."""
+    try:
+        result = subprocess.run(['git', 'lfs', 'version'], capture_output=True,
+                                cwd=PROJECT_ROOT, timeout=15)
+        return result.returncode == 0
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return False
+
+
+def lfs_tracked_patterns():
+    """Patterns in .gitattributes that are stored in Git LFS."""
+    try:
+        with open(GITATTRIBUTES_FILE, 'r', encoding='utf-8') as f:
+            return [line.split()[0] for line in f
+                    if 'filter=lfs' in line and not line.lstrip().startswith('#')]
+    except FileNotFoundError:
+        return []
+
+
+def enable_lfs_for_images():
+    """Track image patterns in Git LFS and convert images already in the tree.
+    
+    Existing images are re-staged with --renormalize so the next commit stores
+    them as LFS pointers; history is not rewritten. Returns (success, log lines).
+    """
+    steps = [
+        ['lfs', 'install', '--local'],
+        ['lfs', 'track'] + LFS_IMAGE_PATTERNS,
+        ['add', '--', '.gitattributes'],
+        ['add', '--renormalize', '--', 'images/'],
+    ]
+    output = []
+    for args in steps:
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(['git'] + args, capture_output=True, text=True,
+                                    cwd=PROJECT_ROOT, timeout=600)
+        except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+            output.append(f"❌ git {' '.join(args[:2])}: {e}")
+            return False, output
+        output.append(f"git {' '.join(args[:2])} ({time.perf_counter() - start:.1f}s)")
+        if result.returncode != 0:
+            output.append(f"❌ {(result.stderr or result.stdout).strip()[:200]}")
+            return False, output
+    return True, output
+
+
+def image_size_report(root=IMAGES_ROOT, largest=5):
+    """Summarize image bytes per top-level folder under images/."""
+    folders = {}
+    files = []
+    for dirpath, _, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        folder = rel_dir.split(os.sep)[0] if rel_dir != '.' else '.'
+        for name in filenames:
+            if not name.lower().endswith(('.jpg', '.jpeg', '.png', '.webp')):
+                continue
+            path = os.path.join(dirpath, name)
+            size = os.path.getsize(path)
+            count, total = folders.get(folder, (0, 0))
+            folders[folder] = (count + 1, total + size)
+            files.append((size, os.path.relpath(path, PROJECT_ROOT).replace(os.sep, '/')))
+    
+    files.sort(reverse=True)
+    return {
+        'folders': dict(sorted(folders.items(), key=lambda item: -item[1][1])),
+        'total_files': len(files),
+        'total_bytes': sum(size for size, _ in files),
+        'largest': files[:largest],
+    }
+
+
+def parse_trip_date_range(label, today=None):
+    """Parse an availableDates label into (start, end) dates, or None if invalid.
+    
+    With `today`, labels without a year (as older Date Picker versions wrote
+    them, e.g. "Aug 21-23") resolve to their next occurrence ending on or
+    after today; the browser would reject them, so only the manager does this.
+    """
+    label = re.sub(r'\s+', ' ', re.sub(r'[–—]', '-', str(label or '').strip()))
+    label = re.sub(r'\.(?=\s*\d{4}(?:-\d{2,4})?\s*$)', ', ', label)
+    
+    match = re.match(r'^([A-Za-z]+)\s+(\d{1,2})\s*-\s*([A-Za-z]+)\s+(\d{1,2}),\s*(\d{4})(?:-(\d{2,4}))?$', label)
+    if match:
+        start_month, end_month = MONTHS.get(match[1].lower()), MONTHS.get(match[3].lower())
+        start_day, end_day, start_year = int(match[2]), int(match[4]), int(match[5])
+        if match[6]:
+            end_year = int(match[6]) if len(match[6]) == 4 else start_year // 100 * 100 + int(match[6])
+        else:
+            end_year = start_year + 1 if (end_month or 0) < (start_month or 0) else start_year
+    else:
+        match = (re.match(r'^([A-Za-z]+)\s+(\d{1,2})\s*-\s*(\d{1,2}),\s*(\d{4})$', label)
+                 or re.match(r'^([A-Za-z]+)\s+(\d{1,2})(),\s*(\d{4})$', label))
+        if not match:
+            if today and label and not re.search(r'\d{4}', label):
+                for year in (today.year, today.year + 1):
+                    dates = parse_trip_date_range(f"{label}, {year}")
+                    if dates and dates[1] >= today:
+                        return dates
+            return None
+        start_month = end_month = MONTHS.get(match[1].lower())
+        start_day = int(match[2])
+        end_day = int(match[3]) if match[3] else start_day
+        start_year = end_year = int(match[4])
+    
+    if not start_month or not end_month:
+        return None
+    try:
+        start = datetime(start_year, start_month, start_day).date()
+        end = datetime(end_year, end_month, end_day).date()
+    except ValueError:
+        return None
+    return (start, end) if end >= start else None
+
+
+def india_today():
+    """Today's date in India, the day js/trip-date-utils.js treats as today."""
+    return datetime.now(INDIA_TZ).date()
+
+
+def trip_date_label(start, end):
+    """Canonical availableDates label: "Aug 21-23, 2026", "Jan 31-Feb 2, 2026", "Dec 30-Jan 1, 2025-26"."""
+    start_month, end_month = calendar.month_abbr[start.month], calendar.month_abbr[end.month]
+    if start.year != end.year:
+        return f"{start_month} {start.day}-{end_month} {end.day}, {start.year}-{end.year % 100:02d}"
+    if start.month != end.month:
+        return f"{start_month} {start.day}-{end_month} {end.day}, {start.year}"
+    if start.day != end.day:
+        return f"{start_month} {start.day}-{end.day}, {start.year}"
+    return f"{start_month} {start.day}, {start.year}"
+
+
+def batch_date_label(start, end):
+    """Long label for a homepage batch, as formatDateRange(start, end, true) builds it."""
+    start_month = calendar.month_abbr[start.month].upper()
+    end_month = calendar.month_abbr[end.month].upper()
+    if start.year == end.year and start.month == end.month:
+        if start.day == end.day:
+            return f"{start_month} {start.day}, {start.year}"
+        return f"{start_month} {start.day}–{end.day}, {start.year}"
+    if start.year == end.year:
+        return f"{start_month} {start.day}–{end_month} {end.day}, {start.year}"
+    return f"{start_month} {start.day}, {start.year}–{end_month} {end.day}, {end.year}"
+
+
+def normalize_trip_dates(labels, today):
+    """Rewrite date labels for saving; returns (labels, expired count, unreadable labels).
+    
+    Readable batches come back in canonical form, sorted and de-duplicated,
+    without those that ended before today. Unreadable labels are kept at the
+    end so nothing typed in is lost; validate_site reports them.
+    """
+    ranges, unreadable, expired = set(), [], 0
+    for label in labels or []:
+        dates = parse_trip_date_range(label, today)
+        if not dates:
+            unreadable.append(label)
+        elif dates[1] < today:
+            expired += 1
+        else:
+            ranges.add(dates)
+    return [trip_date_label(start, end) for start, end in sorted(ranges)] + unreadable, expired, unreadable
+
+
+def build_upcoming_batches(trips, today):
+    """Active trips grouped by departure, soonest first (buildUpcomingBatches without the limit).
+    
+    start/end are UTC-midnight timestamps in ms so the homepage can drop
+    batches that ended since the last save without parsing any labels.
+    Batches are ordered exactly as the JS builds them: in order of first
+    appearance, each trip's dates stably sorted by start, then stably sorted
+    by start overall, so batches sharing a start date keep the same order.
+    """
+    batches = {}
+    for trip in trips:
+        if trip.get('isActive') is False:
+            continue
+        ranges = []
+        for label in trip.get('availableDates') or []:
+            dates = parse_trip_date_range(label)
+            if dates and dates[1] >= today and dates not in ranges:
+                ranges.append(dates)
+        for dates in sorted(ranges, key=lambda dates: dates[0]):
+            start, end = dates
+            batch = batches.setdefault(dates, {
+                'key': f"{start.isoformat()}/{end.isoformat()}",
+                'start': calendar.timegm(start.timetuple()) * 1000,
+                'end': calendar.timegm(end.timetuple()) * 1000,
+                'datetime': start.isoformat(),
+                'dateLabel': batch_date_label(start, end),
+                'weekdayLabel': f"{calendar.day_name[start.weekday()]} Departures",
+                'trips': [],
+            })
+            if not any(t['id'] == trip.get('id') for t in batch['trips']):
+                batch['trips'].append({key: trip.get(key) for key in ('id', 'title', 'price', 'location')})
+    return sorted(batches.values(), key=lambda batch: batch['start'])
+
+
+def parse_price(value):
+    """Rupee amount from a display price like "₹4,399", or None."""
+    match = re.search(r'\d[\d,]*', str(value or ''))
+    return int(match[0].replace(',', '')) if match else None
+
+
+def parse_duration_days(value):
+    """Days from a duration like "2D/1N" or "1 Day", or None."""
+    match = re.search(r'(\d+)\s*(?:D\b|Days?\b)', str(value or ''), re.IGNORECASE)
+    return int(match[1]) if match else None
+
+
+def build_trip_index(trips, today=None):
+    """Numeric facets and presorted id lists so clients filter without parsing display strings.
+    
+    nextDeparture is the UTC midnight (ms) of the first batch starting on or
+    after today, matching the dates js/trip-date-utils.js builds.
+    """
+    today = today or india_today()
+    facets = {}
+    for trip in trips:
+        starts = sorted(r[0] for r in map(parse_trip_date_range, trip.get('availableDates') or []) if r)
+        upcoming = next((start for start in starts if start >= today), None)
+        facets[trip.get('id', '')] = {
+            'price': parse_price(trip.get('price')),
+            'days': parse_duration_days(trip.get('duration')),
+            'difficulty': DIFFICULTY_RANKS.get(str(trip.get('difficulty', '')).strip().lower()),
+            'nextDeparture': calendar.timegm(upcoming.timetuple()) * 1000 if upcoming else None,
+            'featured': trip.get('featured') is True,
+            'active': trip.get('isActive') is not False,
+        }
+    
+    def ordered(field):
+        # Ascending, trips without a value last; ties keep database order
+        return [trip_id for trip_id, _ in sorted(
+            facets.items(), key=lambda item: (item[1][field] is None, item[1][field] or 0))]
+    
+    return {
+        'trips': facets,
+        'sorted': {
+            # Same ranking as trips.html: featured and active, then active, then inactive
+            'featured': [trip_id for trip_id, _ in sorted(
+                facets.items(), key=lambda item: -(2 if item[1]['featured'] and item[1]['active'] else int(item[1]['active'])))],
+            'price': ordered('price'),
+            'duration': ordered('days'),
+            'difficulty': ordered('difficulty'),
+            'departure': ordered('nextDeparture'),
+        },
+    }
+
+
+class ValidationReport:
+    """Errors block a deploy; warnings are shown but don't."""
+    
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+        self.checked = {}
+        self.elapsed = 0.0
+    
+    @property
+    def ok(self):
+        return not self.errors
+    
+    def lines(self, limit=15):
+        """Log lines for the deploy dialog."""
+        counts = ", ".join(f"{count} {name}" for name, count in self.checked.items())
+        lines = [f"   Checked {counts} in {self.elapsed * 1000:.0f}ms"]
+        lines += [f"   ❌ {msg}" for msg in self.errors[:limit]]
+        lines += [f"   ⚠️ {msg}" for msg in self.warnings[:max(0, limit - len(self.errors))]]
+        hidden = len(self.errors) + len(self.warnings) - (len(lines) - 1)
+        if hidden > 0:
+            lines.append(f"   ... and {hidden} more")
+        return lines
+
+
+def deploy_preflight(trips, featured_ids):
+    """Checks every deploy must pass, manual or automatic; returns (ok, log lines).
+    
+    With LFS configured but not installed, images would be committed as full
+    blobs; data that fails validate_site would break the live site.
+    """
+    if lfs_tracked_patterns() and not lfs_available():
+        return False, ["❌ This repository stores images in Git LFS, but git-lfs is not installed",
+                       "   💡 Install it (sudo apt-get install git-lfs) and deploy again"]
+    report = validate_site(trips, featured_ids)
+    lines = report.lines()
+    if not report.ok:
+        lines.append(f"❌ {len(report.errors)} problem(s) must be fixed before deploying")
+    return report.ok, lines
+
+
+def is_local_ref(ref):
+    """True for a relative or root-relative path (not a URL, mailto: or template)."""
+    return bool(ref) and not re.match(r'^(?:[a-zA-Z][\w+.-]*:|//)', ref) and '${' not in ref
+
+
+def validate_site(trips, featured_ids, root=PROJECT_ROOT):
+    """Check trips, featured ids and HTML asset references in one pass."""
+    start = time.perf_counter()
+    report = ValidationReport()
+    exists_cache = {}
+    
+    def exists(ref):
+        if ref not in exists_cache:
+            exists_cache[ref] = os.path.exists(os.path.join(root, ref.lstrip('/')))
+        return exists_cache[ref]
+    
+    seen_ids = set()
+    dates_checked = 0
+    for trip in trips:
+        trip_id = trip.get('id') or '(no id)'
+        if trip_id in seen_ids:
+            report.errors.append(f"{trip_id}: duplicate trip id")
+        seen_ids.add(trip_id)
+        
+        missing = [field for field in REQUIRED_TRIP_FIELDS if not str(trip.get(field, '')).strip()]
+        if missing:
+            report.errors.append(f"{trip_id}: missing {', '.join(missing)}")
+        
+        price = str(trip.get('price', ''))
+        if price and '₹' not in price:
+            report.warnings.append(f"{trip_id}: price without ₹ ({price})")
+        
+        for label in trip.get('availableDates') or []:
+            dates_checked += 1
+            if not parse_trip_date_range(label):
+                report.errors.append(f"{trip_id}: unreadable date '{label}'")
+        
+        image = trip.get('image', '')
+        if is_local_ref(image) and not exists(image):
+            report.errors.append(f"{trip_id}: image not found ({image})")
+        for photo in trip.get('galleryImages') or []:
+            if is_local_ref(photo) and not exists(photo):
+                report.warnings.append(f"{trip_id}: gallery image not found ({photo})")
+    
+    for trip_id in featured_ids:
+        if trip_id not in seen_ids:
+            report.errors.append(f"featured trip '{trip_id}' does not exist")
+    
+    pages = 0
+    for entry in os.scandir(root):
+        if not entry.name.endswith('.html') or not entry.is_file():
+            continue
+        pages += 1
+        with open(entry.path, 'r', encoding='utf-8') as f:
+            refs = set(ASSET_REF_RE.findall(f.read()))
+        for ref in sorted(refs):
+            if is_local_ref(ref) and not exists(ref):
+                report.errors.append(f"{entry.name}: broken reference {ref}")
+    
+    report.checked = {'trips': len(trips), 'dates': dates_checked,
+                      'featured ids': len(featured_ids), 'pages': pages}
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def data_hash(value):
+    """Stable hash of JSON-serialisable data."""
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def replace_once(source, pattern, replacement, label):
+    """Replace the text between a regex's two groups once, failing loudly if the markup changed."""
+    result, count = re.subn(pattern, lambda m: m.group(1) + replacement + m.group(2), source, count=2)
+    if count != 1:
+        raise ValueError(f"trip-detail.html must contain exactly one {label}")
+    return result
+
+
+def compact_description(value, fallback):
+    """Meta description capped at 160 characters, cut at a word boundary."""
+    compact = re.sub(r'\s+', ' ', str(value or fallback)).strip()
+    if len(compact) <= 160:
+        return compact
+    shortened = compact[:157]
+    last_space = shortened.rfind(' ')
+    return (shortened[:last_space] if last_space >= 120 else shortened) + '...'
+
+
+def render_trip_page(template, trip_id, trip, site_origin):
+    """Render trip-detail.html with the trip's content already in the markup.
+    
+    Fills in what the page script renders at load time, plus the crawler
+    metadata that scripts/generate-trip-pages.js injects.
+    """
+    def esc(value):
+        return html.escape(str(value if value is not None else '').strip()).replace('&#x27;', '&#39;')
+    
+    title = str(trip.get('title', '')).strip()
+    page_title = f"{title} - Team Weekend Trekkers"
+    description = compact_description(trip.get('about'), f"Explore {title} with Team Weekend Trekkers.")
+    page_url = f"{site_origin}/trips/{trip_id}/"
+    image_url = f"{site_origin}/{trip.get('image') or 'images/logo.jpg'}"
+    meta = "\n    ".join([
+        "<!-- TRIP_META_START -->",
+        f"<title>{esc(page_title)}</title>",
+        f'<meta name="description" content="{esc(description)}">',
+        f'<link rel="canonical" href="{esc(page_url)}">',
+        '<meta property="og:type" content="website">',
+        '<meta property="og:site_name" content="Team Weekend Trekkers">',
+        f'<meta property="og:title" content="{esc(page_title)}">',
+        f'<meta property="og:description" content="{esc(description)}">',
+        f'<meta property="og:url" content="{esc(page_url)}">',
+        f'<meta property="og:image" content="{esc(image_url)}">',
+        '<meta name="twitter:card" content="summary_large_image">',
+        f'<meta name="twitter:title" content="{esc(page_title)}">',
+        f'<meta name="twitter:description" content="{esc(description)}">',
+        f'<meta name="twitter:image" content="{esc(image_url)}">',
+        "<!-- TRIP_META_END -->",
+    ])
+    
+    page = replace_once(template, r'(<html lang="en" data-trip-id=")(")', esc(trip_id), 'data-trip-id')
+    page = replace_once(page, r'()<!-- TRIP_BASE -->()', '<base href="../../">', 'TRIP_BASE marker')
+    page = replace_once(page, r'()<!-- TRIP_META_START -->[\s\S]*?<!-- TRIP_META_END -->()', meta, 'metadata block')
+    page = replace_once(page, r'(<span id="breadcrumbTitle">)[^<]*(</span>)', esc(title), 'breadcrumb')
+    
+    # Gallery: cover image first, then the trip's gallery
+    gallery = [trip.get('image', '')] + list(trip.get('galleryImages') or [])
+    for index, img_id in enumerate(['galleryMainImg', 'galleryImg1', 'galleryImg2', 'galleryImg3', 'galleryImg4']):
+        src = gallery[index] if index < len(gallery) else gallery[0]
+        page = replace_once(page, rf'(<img src=")[^"]*(" alt="[^"]*" id="{img_id}">)', esc(src), img_id)
+    if len(gallery) > 5:
+        page = replace_once(page, r'(<div class="gallery-overlay">\s*<span>)[^<]*(</span>)',
+                            f"+{len(gallery) - 5} More", 'gallery overlay')
+    
+    glance = {
+        'glanceDuration': trip.get('duration'),
+        'glanceDifficulty': trip.get('difficulty'),
+        'glanceAltitude': trip.get('elevation'),
+        'glanceLocation': str(trip.get('location', '')).split(',')[0],
+        'glanceDistance': trip.get('distance'),
+        'glanceGroupSize': trip.get('groupSize'),
+        'glanceBestTime': trip.get('bestTime'),
+    }
+    for glance_id, value in glance.items():
+        if value:
+            page = replace_once(page, rf'(id="{glance_id}">)[^<]*(</span>)', esc(value), glance_id)
+    
+    for label, field in (('Distance', 'distance'), ('Elevation', 'elevation'),
+                         ('Difficulty', 'difficulty'), ('Best Time', 'bestTime')):
+        if trip.get(field):
+            page = replace_once(page, rf'(<span class="label">{label}</span>\s*<span class="value">)[^<]*(</span>)',
+                                esc(trip[field]), f'{label} card')
+    
+    paragraphs = [p for p in re.split(r'\n\s*\n', str(trip.get('about', ''))) if p.strip()]
+    if paragraphs:
+        about = ''.join(f"\n                        <p>{esc(p)}</p>" for p in paragraphs)
+        page = replace_once(page, r'(<h2>About This Trip</h2>)(?:\s*<p>[\s\S]*?</p>)+(\s*</div>)',
+                            about, 'about section')
+    
+    if trip.get('highlights'):
+        items = ''.join(f'\n                            <li><i class="fas fa-check-circle"></i> {esc(h)}</li>'
+                        for h in trip['highlights'])
+        page = replace_once(page, r'(<ul class="highlights-list">)[\s\S]*?(\s*</ul>)', items, 'highlights list')
+    
+    if trip.get('itinerary'):
+        days = []
+        for index, day in enumerate(trip['itinerary']):
+            activities = ''.join(f"<li>{esc(a)}</li>" for a in day.get('activities', []))
+            days.append(f'''
+                            <div class="accordion-item{' active' if index == 0 else ''}">
+                                <div class="accordion-header">
+                                    <span class="day-badge">{esc(day.get('day'))}</span>
+                                    <h3>{esc(day.get('title'))}</h3>
+                                    <i class="fas fa-chevron-down"></i>
+                                </div>
+                                <div class="accordion-content">
+                                    <ul>{activities}</ul>
+                                </div>
+                            </div>''')
+        page = replace_once(page, r'(<div class="itinerary-accordion">)[\s\S]*?(\n\s*</div>\s*</div>\s*<!-- Includes/Excludes -->)',
+                            ''.join(days), 'itinerary')
+    
+    for box, field in (('includes-box', 'includes'), ('excludes-box', 'excludes')):
+        if trip.get(field):
+            items = ''.join(f"\n                                    <li>{esc(i)}</li>" for i in trip[field])
+            page = replace_once(page, rf'(<div class="{box}">\s*<h3>.*?</h3>\s*<ul>)[\s\S]*?(\s*</ul>)', items, field)
+    
+    if trip.get('thingsToCarry'):
+        items = ''.join(f'\n                            <div class="carry-item"><i class="fas fa-check"></i> {esc(t)}</div>'
+                        for t in trip['thingsToCarry'])
+        page = replace_once(page, r'(<div class="carry-grid">)[\s\S]*?(\n\s*</div>\s*</div>\s*<!-- Perfect For Section -->)',
+                            items, 'things to carry')
+    
+    boarding = [p for p in trip.get('boardingLocations') or [] if p.get('name') and p.get('time')]
+    if boarding:
+        rows = []
+        for point in boarding:
+            map_link = (f'<a href="{esc(point["mapLink"])}" target="_blank" class="map-link">'
+                        f'<i class="fas fa-map-marker-alt"></i> View</a>') if point.get('mapLink') else ''
+            rows.append(f'''
+                                    <tr>
+                                        <td><strong>{esc(point.get('name'))}</strong></td>
+                                        <td>{esc(point.get('landmark'))}</td>
+                                        <td><span class="pickup-time">{esc(point.get('time'))}</span></td>
+                                        <td>{map_link}</td>
+                                    </tr>''')
+        page = replace_once(page, r'(<table class="pickup-table" id="pickupTable">[\s\S]*?<tbody>)[\s\S]*?(\s*</tbody>)',
+                            ''.join(rows), 'pickup table')
+    
+    if trip.get('availableDates'):
+        options = ''.join(f'\n                                    <option value="{esc(d)}">{esc(d)}</option>'
+                          for d in trip['availableDates'])
+        page = replace_once(page, r'(<select name="date" id="dateSelect" required>\s*<option value="">Choose a date</option>)[\s\S]*?(\s*</select>)',
+                            options, 'date select')
+    
+    price = esc(trip.get('price'))
+    page = replace_once(page, r'(id="currentPrice">)[^<]*(</span>)', price, 'current price')
+    page = replace_once(page, r'(<span id="totalAmount">)[^<]*(</span>)', price, 'total amount')
+    
+    whatsapp_title = ''.join(c if c.isascii() and (c.isalnum() or c in '-_.~') else
+                             ''.join(f'%{b:02X}' for b in c.encode('utf-8')) for c in title)
+    return page.replace("text=Hi!%20I'm%20interested%20in%20Netravati%20Peak%20Trek",
+                        f"text=Hi!%20I'm%20interested%20in%20{whatsapp_title}")
+
+
+def trip_page_template():
+    """(template, site origin, trips-data.js script src, template hash) for pre-rendered pages.
+    
+    The hash leaves out the cache version, which is patched into existing pages.
+    """
+    with open(TRIP_DETAIL_TEMPLATE, 'r', encoding='utf-8') as f:
+        template = f.read()
+    with open(CNAME_FILE, 'r', encoding='utf-8') as f:
+        site_origin = f"https://{f.read().strip().lower()}"
+    version = TRIPS_SCRIPT_RE.search(template)
+    script_src = version.group(0) if version else 'js/trips-data.js'
+    template_hash = data_hash([TRIPS_SCRIPT_RE.sub(r'\1', template), site_origin])
+    return template, site_origin, script_src, template_hash
+
+
+def read_trip_pages_manifest():
+    try:
+        with open(TRIP_PAGES_MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def build_trip_pages(trips, force=False):
+    """Pre-render trip pages incrementally; returns (written paths, rebuilt ids, removed ids).
+    
+    A page is re-rendered only when its trip's data hash, or the template,
+    changed since the build recorded in TRIP_PAGES_MANIFEST. A new
+    trips-data.js cache version alone is patched into existing pages.
+    """
+    template, site_origin, script_src, template_hash = trip_page_template()
+    manifest = read_trip_pages_manifest()
+    previous = {} if force or manifest.get('template') != template_hash else manifest.get('trips', {})
+    
+    written, rebuilt, hashes = [], [], {}
+    for trip in trips:
+        trip_id = trip.get('id', '')
+        if not re.match(r'^[a-z0-9][a-z0-9_-]*$', trip_id):
+            print(f"Skipping page for unsafe trip id: {trip_id!r}")
+            continue
+        hashes[trip_id] = data_hash(trip)
+        page_path = os.path.join(TRIP_PAGES_DIR, trip_id, 'index.html')
+        
+        if previous.get(trip_id) == hashes[trip_id] and os.path.exists(page_path):
+            with open(page_path, 'r', encoding='utf-8') as f:
+                page = f.read()
+            if script_src in page:
+                continue
+            page = TRIPS_SCRIPT_RE.sub(script_src, page)
+        else:
+            page = render_trip_page(template, trip_id, trip, site_origin)
+            rebuilt.append(trip_id)
+        
+        os.makedirs(os.path.dirname(page_path), exist_ok=True)
+        with open(page_path, 'w', encoding='utf-8') as f:
+            f.write(page)
+        written.append(page_path)
+    
+    # Only remove pages an earlier build created, never unrelated folders
+    removed = [trip_id for trip_id in manifest.get('trips', {}) if trip_id not in hashes]
+    for trip_id in removed:
+        shutil.rmtree(os.path.join(TRIP_PAGES_DIR, trip_id), ignore_errors=True)
+    
+    if rebuilt or removed or manifest.get('template') != template_hash:
+        with open(TRIP_PAGES_MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump({'template': template_hash, 'trips': hashes}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        written.append(TRIP_PAGES_MANIFEST)
+    return written, rebuilt, removed
+
+
+def stale_trip_pages(trips):
+    """Ids whose committed page no longer matches trips, the template or the cache version.
+    
+    Pages for trips that were removed from trips ("deleted") count as stale too.
+    """
+    _, _, script_src, template_hash = trip_page_template()
+    manifest = read_trip_pages_manifest()
+    recorded = manifest.get('trips', {}) if manifest.get('template') == template_hash else {}
+    stale = []
+    for trip in trips:
+        trip_id = trip.get('id', '')
+        if not re.match(r'^[a-z0-9][a-z0-9_-]*$', trip_id):
+            continue
+        page_path = os.path.join(TRIP_PAGES_DIR, trip_id, 'index.html')
+        if recorded.get(trip_id) != data_hash(trip) or not os.path.exists(page_path):
+            stale.append(trip_id)
+            continue
+        with open(page_path, 'r', encoding='utf-8') as f:
+            if script_src not in f.read():
+                stale.append(trip_id)
+    ids = {trip.get('id') for trip in trips}
+    return stale + [f"{trip_id} (deleted)" for trip_id in manifest.get('trips', {}) if trip_id not in ids]
+
+
+def write_json_atomic(path, value):
+    """Write JSON through a temp file so readers never see a half-written file."""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(value, f, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        f.write('\n')
+    os.replace(temp_path, path)
+
+
+def publish_trip_data(trips, featured_ids):
+    """Publish the JSON data feed; returns (written paths, changed ids, removed paths).
+    
+    data/trips.json is the whole database for first loads. data/manifest.json
+    maps each trip id to its content hash and an immutable per-trip file
+    (data/trips/<id>.<hash>.json), so clients only fetch trips whose hash
+    changed, and carries the build_trip_index filter index. The manifest is
+    replaced last, after every file it names exists, and only when its
+    content changed, so an unchanged feed keeps its ETag.
+    """
+    os.makedirs(TRIP_DATA_TRIPS_DIR, exist_ok=True)
+    try:
+        with open(TRIP_DATA_MANIFEST, 'r', encoding='utf-8') as f:
+            previous_manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        previous_manifest = {}
+    previous = previous_manifest.get('trips', {})
+    
+    written, changed, entries = [], [], {}
+    for trip in trips:
+        trip_id = trip.get('id', '')
+        if not re.match(r'^[a-z0-9][a-z0-9_-]*$', trip_id):
+            print(f"Skipping data file for unsafe trip id: {trip_id!r}")
+            continue
+        digest = data_hash(trip)[:TRIP_DATA_HASH_LENGTH]
+        file_name = f"{trip_id}.{digest}.json"
+        entries[trip_id] = {'hash': digest, 'file': f"trips/{file_name}"}
+        if previous.get(trip_id, {}).get('hash') != digest:
+            changed.append(trip_id)
+        path = os.path.join(TRIP_DATA_TRIPS_DIR, file_name)
+        if not os.path.exists(path):
+            write_json_atomic(path, trip)
+            written.append(path)
+    
+    published = [trip for trip in trips if trip.get('id') in entries]
+    # Order is part of the version: data_hash sorts keys, so entries alone would miss a reorder
+    version = data_hash([list(entries), entries, list(featured_ids)])[:TRIP_DATA_HASH_LENGTH]
+    if previous_manifest.get('version') != version or not os.path.exists(TRIP_DATA_FILE):
+        write_json_atomic(TRIP_DATA_FILE, {'version': version, 'featured': list(featured_ids), 'trips': published})
+        written.append(TRIP_DATA_FILE)
+    manifest = {
+        'version': version,
+        'featured': list(featured_ids),
+        'order': list(entries),
+        'trips': entries,
+        'index': build_trip_index(published),
+    }
+    if manifest != previous_manifest:
+        write_json_atomic(TRIP_DATA_MANIFEST, manifest)
+        written.append(TRIP_DATA_MANIFEST)
+    
+    # Superseded versions go once the new manifest no longer points at them
+    live = {os.path.basename(entry['file']) for entry in entries.values()}
+    removed = []
+    for name in os.listdir(TRIP_DATA_TRIPS_DIR):
+        if name.endswith('.json') and name not in live:
+            os.remove(os.path.join(TRIP_DATA_TRIPS_DIR, name))
+            removed.append(os.path.join(TRIP_DATA_TRIPS_DIR, name))
+    return written, changed, removed
+
+
+# Served to preview pages: data-only changes refresh tripsData in place and re-render
+LIVE_RELOAD_JS = """(function () {
+    'use strict';
+    if (!window.EventSource) return;
+
+    // Page render functions that read tripsData / featuredTripIds
+    const RENDER_HOOKS = ['updateTripPage', 'loadTrips', 'updateCheckoutPage'];
+
+    function loadGlobal(file, name) {
+        return fetch(file + '?livereload=' + Date.now(), { cache: 'no-store' })
+            .then(response => response.text())
+            .then(source => new Function(source + '\\nreturn ' + name + ';')());
+    }
+
+    function refreshData(files) {
+        const jobs = [];
+        if (files.includes('js/trips-data.js') && typeof tripsData !== 'undefined') {
+            jobs.push(loadGlobal('js/trips-data.js', 'tripsData').then(fresh => {
+                Object.keys(tripsData).forEach(key => { if (!(key in fresh)) delete tripsData[key]; });
+                Object.assign(tripsData, fresh);
+            }));
+        }
+        if (files.includes('js/featured-trips.js') && typeof featuredTripIds !== 'undefined') {
+            jobs.push(loadGlobal('js/featured-trips.js', 'featuredTripIds').then(fresh => {
+                featuredTripIds.splice(0, featuredTripIds.length, ...fresh);
+            }));
+        }
+        const hook = RENDER_HOOKS.find(name => typeof window[name] === 'function');
+        if (!jobs.length || !hook) {
+            location.reload();
+            return;
+        }
+        Promise.all(jobs).then(() => window[hook]()).catch(() => location.reload());
+    }
+
+    const events = new EventSource('/__livereload');
+    events.addEventListener('data', event => refreshData(JSON.parse(event.data)));
+    events.addEventListener('reload', () => location.reload());
+}());
+"""
+
+
+class LiveReloadHub:
+    """Watches site files by mtime and fans change events out to SSE clients."""
+    
+    def __init__(self, root=PROJECT_ROOT, interval=LIVE_RELOAD_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.clients = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.html_versions = {}  # HTML path -> content hash ignoring ?v= cache versions
+        self.snapshot = self.scan()
+    
+    def subscribe(self):
+        client = queue.Queue()
+        with self.lock:
+            self.clients.add(client)
+        return client
+    
+    def unsubscribe(self, client):
+        with self.lock:
+            self.clients.discard(client)
+    
+    def publish(self, event):
+        with self.lock:
+            for client in self.clients:
+                client.put(event)
+    
+    def scan(self):
+        """mtime of every watched file: top-level pages, js/, css/ and images/."""
+        mtimes = {}
+        for entry in os.scandir(self.root):
+            if entry.is_file() and entry.name.endswith('.html'):
+                mtimes[entry.name] = entry.stat().st_mtime_ns
+        for folder, extensions in (('js', ('.js',)), ('css', ('.css',)), ('images', LIVE_RELOAD_IMAGE_EXTENSIONS)):
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, folder)):
+                for name in filenames:
+                    if name.lower().endswith(extensions):
+                        path = os.path.join(dirpath, name)
+                        try:
+                            mtimes[os.path.relpath(path, self.root).replace(os.sep, '/')] = os.stat(path).st_mtime_ns
+                        except FileNotFoundError:
+                            pass
+        return mtimes
+    
+    def html_changed(self, rel_path):
+        """False when a page only had its cache-busting version bumped."""
+        try:
+            with open(os.path.join(self.root, rel_path), 'r', encoding='utf-8') as f:
+                content = re.sub(r'\?v=\d+', '', f.read())
+        except OSError:
+            return True
+        digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        previous = self.html_versions.get(rel_path)
+        self.html_versions[rel_path] = digest
+        return previous is not None and previous != digest
+    
+    def watch(self):
+        for name in self.snapshot:
+            if name.endswith('.html'):
+                self.html_changed(name)
+        while not self.stopped.wait(self.interval):
+            current = self.scan()
+            changed = {path for path in set(current) | set(self.snapshot)
+                       if current.get(path) != self.snapshot.get(path)}
+            self.snapshot = current
+            changed = {path for path in changed if not path.endswith('.html') or self.html_changed(path)}
+            if not changed:
+                continue
+            if changed <= set(LIVE_RELOAD_DATA_FILES):
+                self.publish(('data', sorted(changed)))
+            else:
+                self.publish(('reload', sorted(changed)))
+    
+    def stop(self):
+        self.stopped.set()
+        self.publish(None)
+
+
+class PreviewRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler that behaves like a production host.
+    
+    Adds ETag/Last-Modified revalidation, gzip/brotli for text assets,
+    single byte-range requests and keep-alive connections.
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    compressed_cache = {}  # (path, mtime_ns, encoding) -> compressed bytes
+    cache_lock = threading.Lock()
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=PROJECT_ROOT, **kwargs)
+    
+    def log_message(self, format, *args):
+        pass  # Keep the Trip Manager's terminal quiet
+    
+    def do_GET(self):
+        url_path = self.path.split('?', 1)[0]
+        if url_path == '/__livereload':
+            self.stream_events()
+        elif url_path == '/__livereload.js':
+            body = LIVE_RELOAD_JS.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/javascript')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.serve_file(send_body=True)
+    
+    def do_HEAD(self):
+        self.serve_file(send_body=False)
+    
+    def resolve_path(self):
+        """Map the URL to a file, redirecting directories without a trailing slash."""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            url_path = self.path.split('?', 1)[0]
+            if not url_path.endswith('/'):
+                self.send_response(301)
+                self.send_header('Location', url_path + '/')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return None
+            path = os.path.join(path, 'index.html')
+        if not os.path.isfile(path):
+            self.send_error(404, "File not found")
+            return None
+        return path
+    
+    def not_modified(self, etag, mtime):
+        """True when the client's cached copy is still current."""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+    
+    def pick_encoding(self, ctype):
+        """Best compression the client accepts for this content type, or None."""
+        if not (ctype.startswith('text/') or ctype in COMPRESSIBLE_TYPES):
+            return None
+        accepted = self.headers.get('Accept-Encoding', '')
+        if brotli and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+    
+    def compressed_body(self, path, mtime_ns, encoding, raw=None):
+        """Compress a file once per modification and reuse the result."""
+        key = (path, mtime_ns, encoding)
+        with self.cache_lock:
+            body = self.compressed_cache.get(key)
+        if body is None:
+            if raw is None:
+                with open(path, 'rb') as f:
+                    raw = f.read()
+            body = brotli.compress(raw) if encoding == 'br' else gzip.compress(raw, compresslevel=6)
+            with self.cache_lock:
+                # Drop stale versions of this file before caching the new one
+                for stale in [k for k in self.compressed_cache if k[0] == path]:
+                    del self.compressed_cache[stale]
+                self.compressed_cache[key] = body
+        return body
+    
+    def parse_range(self, size):
+        """Parse a single 'bytes=' range into (start, end), None for no range, or False if unsatisfiable."""
+        header = self.headers.get('Range', '')
+        match = re.match(r'^bytes=(\d*)-(\d*)$', header.strip())
+        if not match or not any(match.groups()):
+            return None
+        if match[1]:
+            start = int(match[1])
+            end = min(int(match[2]), size - 1) if match[2] else size - 1
+        else:
+            start, end = max(0, size - int(match[2])), size - 1
+        return (start, end) if start <= end < size else False
+    
+    def serve_file(self, send_body):
+        path = self.resolve_path()
+        if path is None:
+            return
+        
+        stat = os.stat(path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        ctype = self.guess_type(path)
+        encoding = self.pick_encoding(ctype)
+        if encoding:
+            etag = etag[:-1] + f'-{encoding}"'
+        
+        # Pages get the live-reload client; they are small enough to build in memory
+        body = None
+        if ctype == 'text/html' and self.server.hub:
+            with open(path, 'rb') as f:
+                body = f.read()
+            at = body.rfind(b'</body>')
+            at = len(body) if at < 0 else at
+            body = body[:at] + LIVE_RELOAD_SNIPPET + body[at:]
+            etag = etag[:-1] + '-lr"'
+        
+        common_headers = {
+            'Content-Type': ctype,
+            'ETag': etag,
+            'Last-Modified': self.date_time_string(stat.st_mtime),
+            # Pages and data revalidate every load (cheap 304s); media is cached like production
+            'Cache-Control': 'no-cache' if ctype.startswith('text/') or ctype in COMPRESSIBLE_TYPES else 'public, max-age=600',
+            'Accept-Ranges': 'bytes',
+            'Vary': 'Accept-Encoding',
+        }
+        
+        if self.not_modified(etag, stat.st_mtime):
+            self.send_response(304)
+            for name in ('ETag', 'Last-Modified', 'Cache-Control', 'Vary'):
+                self.send_header(name, common_headers[name])
+            self.end_headers()
+            return
+        
+        byte_range = None if encoding or body is not None else self.parse_range(stat.st_size)
+        if byte_range is False:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{stat.st_size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        if encoding:
+            body = self.compressed_body(path, stat.st_mtime_ns, encoding, raw=body)
+            self.send_response(200)
+            common_headers['Content-Encoding'] = encoding
+            common_headers['Content-Length'] = str(len(body))
+        elif body is not None:
+            self.send_response(200)
+            common_headers['Content-Length'] = str(len(body))
+        elif byte_range:
+            start, end = byte_range
+            self.send_response(206)
+            common_headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            common_headers['Content-Length'] = str(end - start + 1)
+        else:
+            self.send_response(200)
+            common_headers['Content-Length'] = str(stat.st_size)
+        
+        for name, value in common_headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not send_body:
+            return
+        
+        try:
+            if body is not None:
+                self.wfile.write(body)
+                return
+            with open(path, 'rb') as f:
+                if byte_range:
+                    f.seek(byte_range[0])
+                    remaining = byte_range[1] - byte_range[0] + 1
+                    while remaining > 0:
+                        chunk = f.read(min(64 * 1024, remaining))
+                        if not chunk:
+                            break
+                        self.wfile.write(chunk)
+                        remaining -= len(chunk)
+                else:
+                    shutil.copyfileobj(f, self.wfile, 64 * 1024)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Browser cancelled the request (e.g. navigated away)
+    
+    def stream_events(self):
+        """Server-sent events: one 'data' or 'reload' event per batch of file changes."""
+        hub = self.server.hub
+        if hub is None:
+            self.send_error(404, "Live reload is off")
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.close_connection = True
+        
+        client = hub.subscribe()
+        try:
+            self.wfile.write(b'retry: 2000\n\n')
+            self.wfile.flush()
+            while True:
+                try:
+                    event = client.get(timeout=15)
+                except queue.Empty:
+                    self.wfile.write(b': ping\n\n')  # Notices closed tabs
+                    self.wfile.flush()
+                    continue
+                if event is None:
+                    break
+                kind, files = event
+                self.wfile.write(f"event: {kind}\ndata: {json.dumps(files)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            hub.unsubscribe(client)
+
+
+class PreviewHTTPServer(http.server.ThreadingHTTPServer):
+    """Threaded server that refuses to share a port with another server."""
+    
+    daemon_threads = True
+    # SO_REUSEADDR lets a second server bind a port in use on Windows, hiding the clash
+    allow_reuse_address = False
+    allow_reuse_port = False
+    hub = None  # LiveReloadHub while live reload is on
+
+
+class PreviewServer:
+    """In-process threaded preview of the website, started and stopped from the app."""
+    
+    def __init__(self, port=PREVIEW_PORT):
+        self.port = port
+        self.httpd = None
+        self.thread = None
+        self.hub = None
+    
+    @property
+    def running(self):
+        return self.httpd is not None
+    
+    @property
+    def url(self):
+        return f"http://localhost:{self.port}/"
+    
+    def start(self):
+        """Start serving, or reuse the running server. Returns the URL."""
+        if self.running:
+            return self.url
+        
+        # Skip ports taken by other programs (including an old `python3 -m http.server`)
+        last_error = None
+        for port in range(PREVIEW_PORT, PREVIEW_PORT + 10):
+            try:
+                self.httpd = PreviewHTTPServer(('127.0.0.1', port), PreviewRequestHandler)
+                self.port = port
+                break
+            except OSError as e:
+                last_error = e
+        else:
+            raise RuntimeError(f"No free port between {PREVIEW_PORT} and {PREVIEW_PORT + 9}: {last_error}")
+        
+        self.hub = LiveReloadHub()
+        self.httpd.hub = self.hub
+        threading.Thread(target=self.hub.watch, daemon=True).start()
+        
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url
+    
+    def stop(self):
+        """Stop serving and free the port."""
+        if not self.running:
+            return
+        self.hub.stop()
+        self.hub = None
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.httpd = None
+        self.thread = None
+
+
+def file_signature(path):
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def merge_trips(base_hashes, local, remote, resolve):
+    """Three-way merge of trip lists by id.
+    
+    A trip changed on only one side (edit, add or delete) takes that side.
+    Trips changed differently on both sides are passed to
+    resolve(trip_id, mine, theirs), which returns the trip to keep or None.
+    Returns (merged trips, ids taken from remote, ids that conflicted).
+    """
+    local_by_id = {trip.get('id'): trip for trip in local}
+    remote_by_id = {trip.get('id'): trip for trip in remote}
+    order = list(remote_by_id) + [trip_id for trip_id in local_by_id if trip_id not in remote_by_id]
+    
+    merged, pulled, conflicts = [], [], []
+    for trip_id in order:
+        mine, theirs = local_by_id.get(trip_id), remote_by_id.get(trip_id)
+        mine_hash = data_hash(mine) if mine is not None else None
+        theirs_hash = data_hash(theirs) if theirs is not None else None
+        base_hash = base_hashes.get(trip_id)
+        
+        if mine_hash == theirs_hash or theirs_hash == base_hash:
+            chosen = mine
+        elif mine_hash == base_hash:
+            chosen = theirs
+            pulled.append(trip_id)
+        else:
+            chosen = resolve(trip_id, mine, theirs)
+            conflicts.append(trip_id)
+        if chosen is not None:
+            merged.append(chosen)
+    return merged, pulled, conflicts
+
+
+class TripStore:
+    """Optional SQLite catalog: the manager's source of truth once enabled.
+    
+    Each trip is kept as JSON next to derived columns (numeric price,
+    duration, difficulty) and one row per batch, so price and date queries
+    use indexes, plus an FTS5 table over titles, highlights and itineraries.
+    Batches that have ended stay in trip_dates as the archive of past seasons;
+    a trip removed from the catalog is only marked deleted, so its archive stays.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS trips (
+            pk INTEGER PRIMARY KEY,  -- stable rowid shared with trips_fts
+            id TEXT NOT NULL UNIQUE,
+            position INTEGER NOT NULL,
+            hash TEXT NOT NULL,
+            data TEXT NOT NULL,
+            title TEXT,
+            price INTEGER,
+            days INTEGER,
+            difficulty INTEGER,
+            active INTEGER NOT NULL DEFAULT 1,
+            deleted TEXT  -- date the trip left the catalog, NULL while listed
+        );
+        CREATE INDEX IF NOT EXISTS trips_price ON trips (price);
+        CREATE TABLE IF NOT EXISTS trip_dates (
+            trip_id TEXT NOT NULL REFERENCES trips (id),
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            PRIMARY KEY (trip_id, start_date, end_date)
+        );
+        CREATE INDEX IF NOT EXISTS trip_dates_start ON trip_dates (start_date);
+        CREATE VIRTUAL TABLE IF NOT EXISTS trips_fts USING fts5 (
+            title, location, highlights, itinerary, about,
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+    
+    def __init__(self, path=TRIP_STORE_FILE):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(self.SCHEMA)
+        if 'deleted' not in {row[1] for row in self.db.execute("PRAGMA table_info(trips)")}:
+            self.db.execute("ALTER TABLE trips ADD COLUMN deleted TEXT")
+    
+    def close(self):
+        self.db.close()
+    
+    def get_meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def set_meta(self, key, value):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+    
+    def load(self):
+        """All trips in display order."""
+        return [json.loads(data) for (data,) in self.db.execute("SELECT data FROM trips WHERE deleted IS NULL ORDER BY position")]
+    
+    def save(self, trips, today=None):
+        """Make the store match `trips`; returns (written count, deleted count).
+        
+        Only trips whose data hash changed are rewritten. Ended batches are
+        kept as the archive even after they leave availableDates, and trips
+        missing from `trips` are marked deleted rather than removed.
+        """
+        today = (today or india_today()).isoformat()
+        stored = dict(self.db.execute("SELECT id, hash FROM trips WHERE deleted IS NULL"))
+        written = 0
+        with self.db:
+            for position, trip in enumerate(trips):
+                trip_id = trip.get('id', '')
+                digest = data_hash(trip)
+                if stored.pop(trip_id, None) == digest:
+                    self.db.execute("UPDATE trips SET position = ? WHERE id = ?", (position, trip_id))
+                    continue
+                written += 1
+                self.db.execute(
+                    "INSERT INTO trips (id, position, hash, data, title, price, days, difficulty, active) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+                    "position = excluded.position, hash = excluded.hash, data = excluded.data, "
+                    "title = excluded.title, price = excluded.price, days = excluded.days, "
+                    "difficulty = excluded.difficulty, active = excluded.active, deleted = NULL",
+                    (trip_id, position, digest, json.dumps(trip, ensure_ascii=False), trip.get('title'),
+                     parse_price(trip.get('price')), parse_duration_days(trip.get('duration')),
+                     DIFFICULTY_RANKS.get(str(trip.get('difficulty', '')).strip().lower()),
+                     int(trip.get('isActive') is not False)))
+                pk = self.db.execute("SELECT pk FROM trips WHERE id = ?", (trip_id,)).fetchone()[0]
+                self.db.execute("DELETE FROM trips_fts WHERE rowid = ?", (pk,))
+                self.db.execute(
+                    "INSERT INTO trips_fts (rowid, title, location, highlights, itinerary, about) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (pk, trip.get('title', ''), trip.get('location', ''),
+                     ' '.join(trip.get('highlights') or []),
+                     ' '.join(f"{day.get('title', '')} {' '.join(day.get('activities', []))}"
+                              for day in trip.get('itinerary') or []),
+                     trip.get('about', '')))
+                self.db.execute("DELETE FROM trip_dates WHERE trip_id = ? AND end_date >= ?", (trip_id, today))
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO trip_dates (trip_id, start_date, end_date) VALUES (?, ?, ?)",
+                    [(trip_id, dates[0].isoformat(), dates[1].isoformat())
+                     for dates in map(parse_trip_date_range, trip.get('availableDates') or []) if dates])
+            for trip_id in stored:
+                pk = self.db.execute("SELECT pk FROM trips WHERE id = ?", (trip_id,)).fetchone()[0]
+                self.db.execute("DELETE FROM trips_fts WHERE rowid = ?", (pk,))
+                self.db.execute("DELETE FROM trip_dates WHERE trip_id = ? AND end_date >= ?", (trip_id, today))
+                self.db.execute("UPDATE trips SET deleted = ? WHERE id = ?", (today, trip_id))
+        return written, len(stored)
+    
+    def search(self, text, limit=50):
+        """Trip ids matching every word (as a prefix), best match first."""
+        words = re.findall(r'\w+', text)
+        if not words:
+            return []
+        query = ' '.join(f'"{word}"*' for word in words)
+        return [trip_id for (trip_id,) in self.db.execute(
+            "SELECT trips.id FROM trips_fts JOIN trips ON trips.pk = trips_fts.rowid "
+            "WHERE trips_fts MATCH ? ORDER BY bm25(trips_fts, 10.0, 3.0, 2.0, 1.0, 1.0) LIMIT ?",
+            (query, limit))]
+    
+    def ids_by_price(self, low=None, high=None):
+        """Trip ids priced within [low, high] rupees, cheapest first."""
+        return [trip_id for (trip_id,) in self.db.execute(
+            "SELECT id FROM trips WHERE deleted IS NULL AND price BETWEEN ? AND ? ORDER BY price, position",
+            (low if low is not None else 0, high if high is not None else 2 ** 62))]
+    
+    def ids_departing(self, start, end, include_archived=False):
+        """Trip ids with a batch starting between two dates, soonest first."""
+        today = india_today().isoformat()
+        return [trip_id for (trip_id,) in self.db.execute(
+            "SELECT trip_id FROM trip_dates WHERE start_date BETWEEN ? AND ? AND (? OR end_date >= ?) "
+            "GROUP BY trip_id ORDER BY MIN(start_date)",
+            (start.isoformat(), end.isoformat(), include_archived, today))]
+
+
+class TripCatalog:
+    """Trips in display order plus an id -> trip index.
+    
+    Iteration, len() and integer indexing work like the list it replaces;
+    lookups and membership tests by id are O(1). Positions are rebuilt
+    lazily after an insert or removal.
+    """
+    
+    def __init__(self, trips=()):
+        self.order = list(trips)
+        self.by_id = {trip.get('id'): trip for trip in self.order}
+        self.positions = None
+    
+    def __iter__(self):
+        return iter(self.order)
+    
+    def __len__(self):
+        return len(self.order)
+    
+    def __getitem__(self, index):
+        return self.order[index]
+    
+    def __contains__(self, trip_id):
+        return trip_id in self.by_id
+    
+    def get(self, trip_id, default=None):
+        return self.by_id.get(trip_id, default)
+    
+    def index(self, trip_id):
+        """Display position of a trip id."""
+        if self.positions is None:
+            self.positions = {trip.get('id'): i for i, trip in enumerate(self.order)}
+        return self.positions[trip_id]
+    
+    def replace(self, trip):
+        """Swap in a new version of a trip, keeping its position."""
+        self.order[self.index(trip.get('id'))] = trip
+        self.by_id[trip.get('id')] = trip
+    
+    def insert(self, index, trip):
+        self.order.insert(index, trip)
+        self.by_id[trip.get('id')] = trip
+        self.positions = None
+    
+    def append(self, trip):
+        self.insert(len(self.order), trip)
+    
+    def remove(self, trip_id):
+        """Drop a trip by id; returns the position it had."""
+        index = self.index(trip_id)
+        del self.order[index]
+        del self.by_id[trip_id]
+        self.positions = None
+        return index
+
+
+class EditHistory:
+    """Bounded undo/redo stack of trip and featured-list changes.
+    
+    Entries keep the trip dicts from before and after a change rather than
+    copies of the whole list. Edits replace a trip with a shallow copy, so
+    fields that didn't change are shared between entries.
+    """
+    
+    def __init__(self, max_steps=HISTORY_MAX_STEPS, max_bytes=HISTORY_MAX_BYTES):
+        self.max_steps = max_steps
+        self.max_bytes = max_bytes
+        self.undo_stack = []
+        self.redo_stack = []
+        self.size = 0
+    
+    @staticmethod
+    def measure(kind, payload):
+        """Approximate bytes an entry keeps alive that no other entry shares."""
+        if kind == 'trip':
+            _, before, after = payload
+            changed = [key for key in set(before) | set(after) if before.get(key) is not after.get(key)]
+            return sum(len(json.dumps([before.get(key), after.get(key)], ensure_ascii=False)) for key in changed)
+        return len(json.dumps(payload, ensure_ascii=False))
+    
+    def push(self, label, kind, *payload):
+        """Record a change; kinds are 'trip', 'insert', 'delete' and 'featured'."""
+        size = self.measure(kind, payload)
+        self.undo_stack.append((label, kind, payload, size))
+        self.size += size - sum(entry[3] for entry in self.redo_stack)
+        self.redo_stack.clear()
+        while len(self.undo_stack) > 1 and (len(self.undo_stack) > self.max_steps or self.size > self.max_bytes):
+            self.size -= self.undo_stack.pop(0)[3]
+    
+    def undo(self):
+        """Pop the latest change (or None) and make it redoable."""
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        return entry
+    
+    def redo(self):
+        """Pop the latest undone change (or None) and make it undoable again."""
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        return entry
+    
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.size = 0
+    
+    @staticmethod
+    def trip_id(entry):
+        """Id of the trip an entry changes, or None for featured-list entries."""
+        _, kind, payload, _ = entry
+        if kind == 'trip':
+            return payload[0]
+        if kind in ('insert', 'delete'):
+            return payload[1].get('id')
+        return None
+    
+    def forget(self, trip_ids):
+        """Drop the entries for these trips, keeping everything else undoable."""
+        trip_ids = set(trip_ids)
+        self.undo_stack[:] = [entry for entry in self.undo_stack if self.trip_id(entry) not in trip_ids]
+        self.redo_stack[:] = [entry for entry in self.redo_stack if self.trip_id(entry) not in trip_ids]
+        self.size = sum(entry[3] for entry in self.undo_stack + self.redo_stack)
+
+
+class DeployQueue:
+    """Single background worker that coalesces queued saves into one commit and push.
+    
+    Every git operation in the app runs under `lock`, so the worker and the
+    Deploy dialog never touch the index at the same time.
+    """
+    
+    def __init__(self, root, on_status, on_pushed=None, debounce=DEPLOY_DEBOUNCE_SECONDS):
+        self.root = root
+        self.on_status = on_status
+        self.on_pushed = on_pushed
+        self.debounce = debounce
+        self.lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+    
+    def submit(self, message, paths, trips, featured_ids):
+        """Queue a save for deployment; returns immediately.
+        
+        `trips` and `featured_ids` are a snapshot of what was saved, checked
+        with deploy_preflight before anything is committed.
+        """
+        self._queue.put((message, set(paths), (list(trips), list(featured_ids))))
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+    
+    def _report(self, message):
+        self.root.after(0, lambda: self.on_status(message))
+    
+    def _run(self):
+        while True:
+            message, paths, snapshot = self._queue.get()
+            messages = [message]
+            
+            # Debounce: keep collecting until no save arrives for `debounce` seconds
+            while True:
+                try:
+                    message, more_paths, snapshot = self._queue.get(timeout=self.debounce)
+                except queue.Empty:
+                    break
+                if message not in messages:
+                    messages.append(message)
+                paths |= more_paths
+            
+            self._report(f"☁️ Deploying {len(messages)} change(s)...")
+            try:
+                with self.lock:
+                    pushed, status_msg = self._commit_and_push(messages, paths, snapshot)
+            except Exception as e:
+                pushed, status_msg = False, f"❌ Deploy failed: {e}"
+            self._report(status_msg)
+            if pushed and self.on_pushed:
+                self.root.after(0, lambda p=paths: self.on_pushed(p))
+    
+    def _commit_and_push(self, messages, paths, snapshot):
+        """Stage the written paths, commit once and push. Returns (pushed, status message)."""
+        ok, lines = deploy_preflight(*snapshot)
+        if not ok:
+            for line in lines:
+                print(line)
+            return False, f"❌ Auto-deploy blocked: {next(line for line in lines if '❌' in line).strip(' ❌')}"
+        
+        git = GitRunner()
+        start = time.perf_counter()
+        try:
+            status = GitStatus.read()
+            git.timings.append(('status', status.elapsed))
+            to_stage = status.paths_to_stage(paths)
+            if not to_stage and not status.ahead:
+                return False, "✅ Nothing new to deploy"
+            
+            if to_stage:
+                success, output, _ = git.run(['add', '-A', '--'] + to_stage, timeout=300)
+                if not success:
+                    return False, f"❌ Staging failed: {output[:60]}"
+                print(f"Auto-deploy: staged {len(to_stage)} path(s) {git.last_timing()}")
+                if len(messages) == 1:
+                    commit_message = messages[0]
+                else:
+                    commit_message = (f"{messages[0]} (+{len(messages) - 1} more)\n\n"
+                                      + "\n".join(f"- {m}" for m in messages))
+                success, output, _ = git.run(['commit', '-m', commit_message], timeout=120)
+                if not success:
+                    return False, f"❌ Commit failed: {output[:60]}"
+                print(f"Auto-deploy: committed {git.last_timing()}")
+            
+            success, output, _ = git.run(['push', 'origin', 'main'], timeout=120)
+            if not success:
+                return False, f"⚠️ Push failed: {output[:60]}"
+            print(f"Auto-deploy: pushed {git.last_timing()}")
+            return True, "☁️ Pushed to GitHub!"
+        finally:
+            print(f"Auto-deploy: {git.summary(time.perf_counter() - start)}")
+
+
 class DatePicker(tk.Toplevel):
     """A beautiful calendar date picker widget."""
     
@@ -223,16 +2051,8 @@ class DatePicker(tk.Toplevel):
     def confirm_selection(self):
         """Confirm and return the selected date range."""
         if self.selected_start:
-            if self.selected_end:
-                # Format as "Jan 15-17" or "Jan 15 - Feb 2" if different months
-                if self.selected_start.month == self.selected_end.month:
-                    date_str = f"{self.selected_start.strftime('%b')} {self.selected_start.day}-{self.selected_end.day}"
-                else:
-                    date_str = f"{self.selected_start.strftime('%b %d')} - {self.selected_end.strftime('%b %d')}"
-            else:
-                date_str = self.selected_start.strftime('%b %d')
-            
-            self.callback(date_str)
+            # Full label with the year, e.g. "Jan 15-17, 2026" or "Jan 31-Feb 2, 2026"
+            self.callback(trip_date_label(self.selected_start, self.selected_end or self.selected_start))
         self.destroy()
 
 
@@ -244,12 +2064,27 @@ class TripManagerApp:
         self.root.configure(bg=COLORS['bg'])
         
         # Data
-        self.trips = []
-        self.current_trip_index = None
+        self.trips = TripCatalog()
+        self.current_trip_id = None  # Trip open in the edit form
         self.unsaved_changes = False
+        self.history = EditHistory()
+        self.parsed_blocks = {}  # Trip block source -> parsed trip (for incremental re-parsing)
+        self.disk_signature = None  # trips-data.js (mtime_ns, size) when last loaded or saved
+        self.disk_hashes = {}  # Trip id -> data hash as last loaded or saved (merge base)
+        self.written_files = set()  # Project-relative paths written this session
+        self.deploy_queue = DeployQueue(root, self.update_status,
+                                        on_pushed=self.written_files.difference_update)
+        self.auto_deploy = tk.BooleanVar(value=False)
+        self.preview = PreviewServer()
+        # Stays on once pages have been published, so they never go stale
+        self.prerender_pages = tk.BooleanVar(value=os.path.exists(TRIP_PAGES_MANIFEST))
+        self.store = TripStore() if os.path.exists(TRIP_STORE_FILE) else None
+        self.use_store = tk.BooleanVar(value=self.store is not None)
         
         # Load trips
         self.load_trips()
+        self.featured_trip_ids = self.load_featured_trips()
+        self.remember_featured_state()
         
         # Create UI
         self.create_styles()
@@ -257,6 +2092,13 @@ class TripManagerApp:
         
         # Bind close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Notice edits made to trips-data.js by other tools (e.g. the mobile app)
+        self.root.after(TRIPS_WATCH_INTERVAL_MS, self.watch_trips_file)
+        
+        # Undo/redo shortcuts; both keysym cases so Caps Lock doesn't change their meaning
+        for sequence in ('<Control-z>', '<Control-Z>', '<Control-y>', '<Control-Y>'):
+            self.root.bind_all(sequence, self.on_history_shortcut)
     
     def create_styles(self):
         """Configure ttk styles for modern look."""
@@ -346,6 +2188,7 @@ class TripManagerApp:
             ("⭐ Featured Trips", self.show_featured_trips),
             ("🖼️ Photo Manager", self.show_photo_manager),
             ("💾 Save Changes", self.save_trips),
+            ("🌐 Local Preview", self.deploy_site),
             ("🚀 Deploy to GitHub", self.deploy_to_github),
         ]
         
@@ -365,6 +2208,34 @@ class TripManagerApp:
         status_frame = tk.Frame(sidebar, bg=COLORS['sidebar'])
         status_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=20, padx=20)
         
+        tk.Checkbutton(status_frame, text="☁️ Auto-deploy after saving",
+                      variable=self.auto_deploy,
+                      font=('Helvetica', 10),
+                      bg=COLORS['sidebar'], fg=COLORS['text'],
+                      selectcolor=COLORS['card'],
+                      activebackground=COLORS['sidebar'],
+                      activeforeground=COLORS['text'],
+                      bd=0, highlightthickness=0).pack(anchor='w', pady=(0, 10))
+        
+        tk.Checkbutton(status_frame, text="📄 Pre-render trip pages",
+                      variable=self.prerender_pages,
+                      font=('Helvetica', 10),
+                      bg=COLORS['sidebar'], fg=COLORS['text'],
+                      selectcolor=COLORS['card'],
+                      activebackground=COLORS['sidebar'],
+                      activeforeground=COLORS['text'],
+                      bd=0, highlightthickness=0).pack(anchor='w', pady=(0, 10))
+        
+        tk.Checkbutton(status_frame, text="🗄️ SQLite catalog",
+                      variable=self.use_store,
+                      command=self.toggle_store,
+                      font=('Helvetica', 10),
+                      bg=COLORS['sidebar'], fg=COLORS['text'],
+                      selectcolor=COLORS['card'],
+                      activebackground=COLORS['sidebar'],
+                      activeforeground=COLORS['text'],
+                      bd=0, highlightthickness=0).pack(anchor='w', pady=(0, 10))
+        
         self.status_label = tk.Label(status_frame, 
                                      text=f"✅ {len(self.trips)} trips loaded",
                                      font=('Helvetica', 10),
@@ -430,6 +2301,17 @@ class TripManagerApp:
         # Add search trace AFTER trips_frame is created
         self.search_var.trace('w', self.filter_trips)
     
+    def matching_trips(self, filter_text=""):
+        """Trips shown in the list for a search box value, in catalog order."""
+        if not filter_text:
+            return list(self.trips)
+        # The catalog also matches highlights and itineraries; titles are
+        # checked directly so unsaved edits still show up
+        matches = set(self.store.search(filter_text, limit=-1)) if self.store else set()
+        needle = filter_text.lower()
+        return [trip for trip in self.trips
+                if needle in trip.get('title', '').lower() or trip.get('id') in matches]
+    
     def display_trips(self, filter_text=""):
         """Display trip cards."""
         # Safety check
@@ -443,11 +2325,7 @@ class TripManagerApp:
         except tk.TclError:
             return
         
-        for idx, trip in enumerate(self.trips):
-            # Filter check
-            if filter_text and filter_text.lower() not in trip.get('title', '').lower():
-                continue
-            
+        for trip in self.matching_trips(filter_text):
             # Trip card
             card = tk.Frame(self.trips_frame, bg=COLORS['card'], pady=15, padx=20)
             card.pack(fill=tk.X, pady=5, padx=5)
@@ -478,14 +2356,14 @@ class TripManagerApp:
                                font=('Helvetica', 10),
                                bg=COLORS['accent'], fg=COLORS['text'],
                                bd=0, padx=15, pady=5, cursor='hand2',
-                               command=lambda i=idx: self.show_edit_trip(i))
+                               command=lambda i=trip.get('id'): self.show_edit_trip(i))
             edit_btn.pack(side=tk.LEFT, padx=5)
             
             del_btn = tk.Button(btn_frame, text="🗑️", 
                               font=('Helvetica', 10),
                               bg='#dc3545', fg=COLORS['text'],
                               bd=0, padx=10, pady=5, cursor='hand2',
-                              command=lambda i=idx: self.delete_trip(i))
+                              command=lambda i=trip.get('id'): self.delete_trip(i))
             del_btn.pack(side=tk.LEFT)
     
     def filter_trips(self, *args):
@@ -498,10 +2376,10 @@ class TripManagerApp:
             filter_text = ""
         self.display_trips(filter_text)
     
-    def show_edit_trip(self, index):
+    def show_edit_trip(self, trip_id):
         """Show edit form for a trip."""
-        self.current_trip_index = index
-        trip = self.trips[index]
+        self.current_trip_id = trip_id
+        trip = self.trips.get(trip_id)
         self.clear_content()
         
         # Header
@@ -658,7 +2536,7 @@ class TripManagerApp:
         self.itinerary_days_frame.pack(fill=tk.X, padx=15, pady=(0, 10))
         
         # Store itinerary data
-        self.current_itinerary = trip.get('itinerary', [])
+        self.current_itinerary = list(trip.get('itinerary', []))  # Edited copy; stored on save
         
         # Display existing days
         self.display_itinerary_days()
@@ -923,10 +2801,13 @@ class TripManagerApp:
 
     def save_trip_edit(self):
         """Save edits to current trip."""
-        if self.current_trip_index is None:
+        before = self.trips.get(self.current_trip_id)
+        if before is None:
+            messagebox.showerror("Error", "This trip no longer exists (it was deleted elsewhere).")
             return
         
-        trip = self.trips[self.current_trip_index]
+        # Edit a copy so the previous version stays intact for undo
+        trip = dict(before)
         
         # Update fields - keep all values as strings (price includes ₹ symbol)
         for field_id, var in self.edit_vars.items():
@@ -945,15 +2826,17 @@ class TripManagerApp:
         
         # Update itinerary
         if hasattr(self, 'current_itinerary'):
-            trip['itinerary'] = self.current_itinerary
+            trip['itinerary'] = list(self.current_itinerary)
         
+        self.trips.replace(trip)
+        self.history.push(f"Edit {trip.get('title', '')}", 'trip', self.current_trip_id, before, trip)
         self.unsaved_changes = True
         self.update_status("✏️ Trip updated - Don't forget to save!")
         messagebox.showinfo("Success", "Trip updated! Click 'Save Changes' to write to file.")
     
     def show_add_trip(self):
         """Show form to add new trip - matches Edit Trip form with all fields."""
-        self.current_trip_index = None
+        self.current_trip_id = None
         self.clear_content()
         
         # Initialize for new trip
@@ -1175,10 +3058,9 @@ class TripManagerApp:
             return
         
         # Check for duplicate ID
-        for existing_trip in self.trips:
-            if existing_trip.get('id') == trip_id:
-                messagebox.showerror("Error", f"Trip ID '{trip_id}' already exists!\nPlease use a unique ID.")
-                return
+        if trip_id in self.trips:
+            messagebox.showerror("Error", f"Trip ID '{trip_id}' already exists!\nPlease use a unique ID.")
+            return
         
         # Get highlights from text
         highlights_text = self.highlights_text.get('1.0', tk.END).strip()
@@ -1217,28 +3099,36 @@ class TripManagerApp:
         }
         
         self.trips.append(trip)
+        self.history.push(f"Add {trip['title']}", 'insert', len(self.trips) - 1, trip)
         self.unsaved_changes = True
         self.update_status(f"✅ Added new trip: {trip['title']}")
         messagebox.showinfo("Success", f"Trip '{trip['title']}' added!\n\nDon't forget to:\n1. Click 'Save Changes'\n2. Add trip image to images/trips/{trip_id}.jpg")
         self.show_trip_list()
     
-    def delete_trip(self, index):
+    def delete_trip(self, trip_id):
         """Delete a trip."""
-        trip = self.trips[index]
+        trip = self.trips.get(trip_id)
+        if trip is None:
+            messagebox.showerror("Error", "This trip no longer exists (it was deleted elsewhere).")
+            self.display_trips()
+            return
         if messagebox.askyesno("Confirm Delete", 
                               f"Are you sure you want to delete '{trip.get('title')}'?"):
-            del self.trips[index]
+            index = self.trips.remove(trip_id)
+            # A deleted trip can't stay featured; undo restores both
+            featured_before = list(self.featured_trip_ids)
+            self.featured_trip_ids = [tid for tid in featured_before if tid != trip_id]
+            self.history.push(f"Delete {trip.get('title')}", 'delete', index, trip,
+                              featured_before, list(self.featured_trip_ids))
             self.unsaved_changes = True
             self.update_status(f"🗑️ Deleted trip: {trip.get('title')}")
             self.display_trips()
     
     def show_featured_trips(self):
         """Show featured trips management screen."""
+        self.merge_featured_changes()
         self.clear_content()
         
-        # Load current featured trips
-        self.featured_trip_ids = self.load_featured_trips()
-        
         # Header
         header = tk.Frame(self.content_frame, bg=COLORS['bg'])
         header.pack(fill=tk.X, pady=(0, 20))
@@ -1282,9 +3172,10 @@ class TripManagerApp:
         self.available_listbox.config(yscrollcommand=avail_scrollbar.set)
         
         # Populate available trips (excluding already featured ones)
+        featured = set(self.featured_trip_ids)
         for trip in self.trips:
             trip_id = trip.get('id', '')
-            if trip_id not in self.featured_trip_ids:
+            if trip_id not in featured:
                 self.available_listbox.insert(tk.END, f"{trip.get('title', 'Unknown')} [{trip_id}]")
         
         # Center - Action Buttons
@@ -1387,17 +3278,17 @@ class TripManagerApp:
         """Refresh the featured listbox display."""
         self.featured_listbox.delete(0, tk.END)
         for i, trip_id in enumerate(self.featured_trip_ids):
-            # Find trip title
-            trip = next((t for t in self.trips if t.get('id') == trip_id), None)
+            trip = self.trips.get(trip_id)
             title = trip.get('title', 'Unknown') if trip else f"Unknown ({trip_id})"
             self.featured_listbox.insert(tk.END, f"{i+1}. {title} [{trip_id}]")
     
     def refresh_available_listbox(self):
         """Refresh the available listbox display."""
         self.available_listbox.delete(0, tk.END)
+        featured = set(self.featured_trip_ids)
         for trip in self.trips:
             trip_id = trip.get('id', '')
-            if trip_id not in self.featured_trip_ids:
+            if trip_id not in featured:
                 self.available_listbox.insert(tk.END, f"{trip.get('title', 'Unknown')} [{trip_id}]")
     
     def add_to_featured(self):
@@ -1416,7 +3307,9 @@ class TripManagerApp:
         trip_id = re.search(r'\[([^\]]+)\]$', item_text)
         if trip_id:
             trip_id = trip_id.group(1)
+            before = list(self.featured_trip_ids)
             self.featured_trip_ids.append(trip_id)
+            self.history.push(f"Feature {trip_id}", 'featured', before, list(self.featured_trip_ids))
             self.refresh_featured_listbox()
             self.refresh_available_listbox()
             self.update_status(f"⭐ Added to featured: {trip_id}")
@@ -1433,7 +3326,9 @@ class TripManagerApp:
         trip_id = re.search(r'\[([^\]]+)\]$', item_text)
         if trip_id:
             trip_id = trip_id.group(1)
+            before = list(self.featured_trip_ids)
             self.featured_trip_ids.remove(trip_id)
+            self.history.push(f"Unfeature {trip_id}", 'featured', before, list(self.featured_trip_ids))
             self.refresh_featured_listbox()
             self.refresh_available_listbox()
             self.update_status(f"❌ Removed from featured: {trip_id}")
@@ -1445,8 +3340,10 @@ class TripManagerApp:
             return
         
         idx = selection[0]
+        before = list(self.featured_trip_ids)
         self.featured_trip_ids[idx], self.featured_trip_ids[idx-1] = \
             self.featured_trip_ids[idx-1], self.featured_trip_ids[idx]
+        self.history.push("Reorder featured trips", 'featured', before, list(self.featured_trip_ids))
         self.refresh_featured_listbox()
         self.featured_listbox.selection_set(idx-1)
     
@@ -1457,15 +3354,31 @@ class TripManagerApp:
             return
         
         idx = selection[0]
+        before = list(self.featured_trip_ids)
         self.featured_trip_ids[idx], self.featured_trip_ids[idx+1] = \
             self.featured_trip_ids[idx+1], self.featured_trip_ids[idx]
+        self.history.push("Reorder featured trips", 'featured', before, list(self.featured_trip_ids))
         self.refresh_featured_listbox()
         self.featured_listbox.selection_set(idx+1)
     
     def save_featured_trips(self):
         """Save featured trips to file."""
         try:
-            content = '''// ============================================
+            self.write_featured_file()
+            self.publish_data_feed()
+            
+            self.update_status("⭐ Featured trips saved!")
+            if self.auto_deploy.get():
+                self.git_push_changes("Update featured trips")
+            messagebox.showinfo("Success", 
+                              f"Featured trips saved!\n\nSelected trips:\n" + 
+                              "\n".join([f"• {tid}" for tid in self.featured_trip_ids]))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save: {e}")
+    
+    def write_featured_file(self):
+        """Write featured-trips.js from self.featured_trip_ids."""
+        content = '''// ============================================
 // FEATURED TRIPS CONFIGURATION
 // ============================================
 // 
@@ -1478,10 +3391,10 @@ class TripManagerApp:
 
 const featuredTripIds = [
 '''
-            for trip_id in self.featured_trip_ids:
-                content += f'    "{trip_id}",\n'
-            
-            content += '''];
+        for trip_id in self.featured_trip_ids:
+            content += f'    "{trip_id}",\n'
+        
+        content += '''];
 
 // Function to get featured trips data
 function getFeaturedTrips() {
@@ -1494,16 +3407,11 @@ function getFeaturedTrips() {
     }).filter(t => t !== null);
 }
 '''
-            
-            with open(FEATURED_TRIPS_FILE, 'w') as f:
-                f.write(content)
-            
-            self.update_status("⭐ Featured trips saved!")
-            messagebox.showinfo("Success", 
-                              f"Featured trips saved!\n\nSelected trips:\n" + 
-                              "\n".join([f"• {tid}" for tid in self.featured_trip_ids]))
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save: {e}")
+        
+        with open(FEATURED_TRIPS_FILE, 'w') as f:
+            f.write(content)
+        self.mark_written(FEATURED_TRIPS_FILE)
+        self.remember_featured_state()
 
     def show_photo_manager(self):
         """Show photo management screen."""
@@ -1569,6 +3477,32 @@ function getFeaturedTrips() {
                                    command=lambda: os.system(f'xdg-open "{IMAGES_DIR}"'))
         open_folder_btn.pack(side=tk.LEFT, padx=5)
         
+        # Storage report
+        storage_frame = tk.Frame(self.content_frame, bg=COLORS['card'])
+        storage_frame.pack(fill=tk.X, pady=10)
+        
+        report = image_size_report()
+        lfs_patterns = lfs_tracked_patterns()
+        lines = [f"📦 Image Storage: {report['total_files']} images, {format_size(report['total_bytes'])}"
+                 f" — {'stored in Git LFS' if lfs_patterns else 'stored directly in git history'}"]
+        for folder, (count, total) in list(report['folders'].items())[:4]:
+            lines.append(f"   • {folder}/: {count} files, {format_size(total)}")
+        if report['largest']:
+            size, path = report['largest'][0]
+            lines.append(f"   • Largest: {path} ({format_size(size)})")
+        
+        tk.Label(storage_frame, text="\n".join(lines), font=('Helvetica', 10),
+                bg=COLORS['card'], fg=COLORS['text_secondary'],
+                justify=tk.LEFT).pack(side=tk.LEFT, padx=15, pady=15, anchor='w')
+        
+        if not lfs_patterns:
+            lfs_btn = tk.Button(storage_frame, text="📦 Move Images to Git LFS",
+                               font=('Helvetica', 10),
+                               bg=COLORS['accent'], fg=COLORS['text'],
+                               bd=0, padx=15, pady=6, cursor='hand2',
+                               command=self.migrate_images_to_lfs)
+            lfs_btn.pack(side=tk.RIGHT, padx=15)
+        
         # Info
         info_frame = tk.Frame(self.content_frame, bg=COLORS['card'])
         info_frame.pack(fill=tk.X, pady=10)
@@ -1602,48 +3536,220 @@ function getFeaturedTrips() {
             try:
                 os.makedirs(IMAGES_DIR, exist_ok=True)
                 shutil.copy2(filepath, dest)
+                self.mark_written(dest)
                 self.photos_listbox.insert(tk.END, filename)
                 self.update_status(f"📷 Photo added: {filename}")
                 messagebox.showinfo("Success", f"Photo '{filename}' added successfully!")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to copy photo: {e}")
     
+    def migrate_images_to_lfs(self):
+        """Route images/ through Git LFS and stage existing images as LFS pointers."""
+        if not lfs_available():
+            messagebox.showerror("Git LFS Not Installed",
+                               "Install Git LFS first:\n\n"
+                               "  sudo apt-get install git-lfs\n\n"
+                               "or download it from https://git-lfs.com")
+            return
+        
+        if not messagebox.askyesno("Move Images to Git LFS",
+                                  "New and existing images under images/ will be stored in Git LFS.\n\n"
+                                  "Existing history is not rewritten. The converted images are\n"
+                                  "staged and go out with your next Deploy.\n\nContinue?"):
+            return
+        
+        self.update_status("📦 Migrating images to Git LFS...")
+        
+        def migrate_thread():
+            success, output = enable_lfs_for_images()
+            print("\n".join(output))
+            
+            def done():
+                if success:
+                    self.mark_written(GITATTRIBUTES_FILE)
+                    self.update_status("📦 Images now tracked by Git LFS")
+                    messagebox.showinfo("Success", "Images are now tracked by Git LFS.\n\n"
+                                       "Click 'Deploy to GitHub' to publish the change.")
+                    self.show_photo_manager()
+                else:
+                    self.update_status("❌ Git LFS migration failed")
+                    messagebox.showerror("Error", "Git LFS migration failed:\n\n" + "\n".join(output[-3:]))
+            self.root.after(0, done)
+        
+        threading.Thread(target=migrate_thread, daemon=True).start()
+    
     def load_trips(self):
         """Load trips from JavaScript file."""
         try:
             with open(TRIPS_DATA_FILE, 'r') as f:
                 content = f.read()
             
-            # Try array format first: const tripsData = [...]
-            match = re.search(r'const\s+tripsData\s*=\s*(\[[\s\S]*?\]);', content)
-            if match:
-                js_array = match.group(1)
-                json_str = self.js_to_json(js_array)
-                self.trips = json.loads(json_str)
-                return
-            
-            # Try object format: const tripsData = {...}
-            match = re.search(r'const\s+tripsData\s*=\s*(\{[\s\S]*?\});', content)
-            if match:
-                js_obj = match.group(1)
-                json_str = self.js_to_json(js_obj)
-                trips_dict = json.loads(json_str)
-                # Convert object to array, adding 'id' field
-                self.trips = []
-                for trip_id, trip_data in trips_dict.items():
-                    trip_data['id'] = trip_id
-                    self.trips.append(trip_data)
+            trips = self.parse_trips_content(content)
+            self.remember_disk_state(trips)
+            if trips is not None and self.store:
+                trips = self.load_from_store(content, trips)
+            if trips is not None:
+                self.trips = TripCatalog(trips)
                 return
             
-            self.trips = []
+            self.trips = TripCatalog()
             messagebox.showwarning("Warning", "Could not parse trips data file.")
         except FileNotFoundError:
-            self.trips = []
+            self.trips = TripCatalog()
             messagebox.showerror("Error", f"Trips data file not found:\n{TRIPS_DATA_FILE}")
         except Exception as e:
-            self.trips = []
+            self.trips = TripCatalog()
             messagebox.showerror("Error", f"Error loading trips: {e}")
     
+    def load_from_store(self, content, file_trips):
+        """Trips from the SQLite catalog, re-importing trips-data.js if it changed outside the manager."""
+        if self.store.get_meta('js_hash') == hashlib.sha256(content.encode('utf-8')).hexdigest():
+            return self.store.load()
+        written, deleted = self.store.save(file_trips)
+        print(f"Imported trips-data.js into the catalog ({written} updated, {deleted} removed)")
+        return file_trips
+    
+    def toggle_store(self):
+        """Turn the SQLite catalog on (built from the current trips) or off."""
+        if self.use_store.get():
+            self.store = TripStore()
+            written, _ = self.store.save(self.trips)
+            self.update_status(f"🗄️ SQLite catalog enabled ({written} trips)")
+            return
+        if not messagebox.askyesno("SQLite Catalog",
+                                   "Stop using the SQLite catalog?\n\n"
+                                   "trips-data.js keeps every trip, but the archive of past "
+                                   "batches in admin/trips.db will be deleted."):
+            self.use_store.set(True)
+            return
+        self.store.close()
+        self.store = None
+        os.remove(TRIP_STORE_FILE)
+        self.update_status("🗄️ SQLite catalog disabled")
+    
+    def parse_trips_content(self, content):
+        """Parse tripsData from trips-data.js source, or None if not found.
+        
+        Trip blocks seen before are reused from self.parsed_blocks, so only
+        trips whose source text changed go through js_to_json again.
+        """
+        # Try array format first: const tripsData = [...]
+        match = re.search(r'const\s+tripsData\s*=\s*(\[[\s\S]*?\]);', content)
+        if match:
+            js_array = match.group(1)
+            json_str = self.js_to_json(js_array)
+            return json.loads(json_str)
+        
+        # Try object format: const tripsData = {...}
+        match = re.search(r'const\s+tripsData\s*=\s*(\{[\s\S]*?\});', content)
+        if not match:
+            return None
+        js_obj = match.group(1)
+        
+        blocks = TRIP_BLOCK_RE.findall(js_obj)
+        if not blocks:
+            # Unfamiliar layout: parse the whole object in one go
+            trips_dict = json.loads(self.js_to_json(js_obj))
+            return [dict(trip_data, id=trip_id) for trip_id, trip_data in trips_dict.items()]
+        
+        parsed_blocks = {}
+        trips = []
+        for trip_id, block in blocks:
+            trip_data = self.parsed_blocks.get(block)
+            if trip_data is None:
+                trip_data = json.loads(self.js_to_json(block))
+            parsed_blocks[block] = trip_data
+            # Convert object to array, adding 'id' field
+            trips.append(dict(trip_data, id=trip_id))
+        self.parsed_blocks = parsed_blocks
+        return trips
+    
+    def read_saved_trips(self):
+        """Trips as trips-data.js holds them now (None if it can't be read or parsed)."""
+        try:
+            with open(TRIPS_DATA_FILE, 'r', encoding='utf-8') as f:
+                return self.parse_trips_content(f.read())
+        except (OSError, ValueError):
+            return None
+    
+    def remember_disk_state(self, trips):
+        """Record what trips-data.js holds now, as the base for later merges."""
+        self.disk_signature = file_signature(TRIPS_DATA_FILE)
+        self.disk_hashes = {trip.get('id'): data_hash(trip) for trip in trips or []}
+    
+    def remember_featured_state(self):
+        """Record the featured list featured-trips.js holds now, as the base for later merges."""
+        self.featured_signature = file_signature(FEATURED_TRIPS_FILE)
+        self.featured_on_disk = list(self.featured_trip_ids)
+    
+    def merge_featured_changes(self):
+        """Fold edits made to featured-trips.js outside the app into self.featured_trip_ids.
+        
+        Without local changes the file wins; otherwise trips we unfeatured are
+        dropped from the file's list and trips we featured are appended to it.
+        """
+        if file_signature(FEATURED_TRIPS_FILE) == self.featured_signature:
+            return
+        theirs = self.load_featured_trips()
+        base, mine = self.featured_on_disk, self.featured_trip_ids
+        removed = set(base) - set(mine)
+        merged = [tid for tid in theirs if tid not in removed]
+        merged += [tid for tid in mine if tid not in base and tid not in merged]
+        self.featured_trip_ids = merged
+        self.featured_signature = file_signature(FEATURED_TRIPS_FILE)
+        self.featured_on_disk = list(theirs)
+    
+    def watch_trips_file(self):
+        """Periodic check for external edits to trips-data.js."""
+        try:
+            self.merge_external_changes()
+        except Exception as e:
+            print(f"Error checking trips file: {e}")
+        self.root.after(TRIPS_WATCH_INTERVAL_MS, self.watch_trips_file)
+    
+    def merge_external_changes(self):
+        """Fold edits made to trips-data.js and featured-trips.js outside the app into memory."""
+        self.merge_featured_changes()
+        signature = file_signature(TRIPS_DATA_FILE)
+        if signature is None or signature == self.disk_signature:
+            return
+        
+        with open(TRIPS_DATA_FILE, 'r') as f:
+            remote = self.parse_trips_content(f.read())
+        if remote is None:
+            # Half-written or broken file; look again on the next tick
+            return
+        
+        def resolve(trip_id, mine, theirs):
+            title = (mine or theirs).get('title', trip_id)
+            mine_desc = "deleted it" if mine is None else "edited it"
+            theirs_desc = "deleted" if theirs is None else "changed"
+            answer = messagebox.askyesno(
+                "Trip Changed Elsewhere",
+                f"'{title}' was {theirs_desc} in trips-data.js by another tool, "
+                f"but you also {mine_desc} here.\n\n"
+                f"Keep YOUR version?\n(No = use the version from the file)")
+            return mine if answer else theirs
+        
+        local = self.trips
+        merged, pulled, conflicts = merge_trips(self.disk_hashes, local, remote, resolve)
+        self.remember_disk_state(remote)
+        self.trips = TripCatalog(merged)
+        
+        # Undoing an edit to a trip the file replaced would throw the outside change
+        # away, so only those trips lose their history; everything else stays undoable
+        replaced = [trip_id for trip_id in pulled + conflicts
+                    if self.trips.get(trip_id) is not local.get(trip_id)]
+        self.history.forget(replaced)
+        
+        # Still unsaved if anything of ours is not in the file
+        self.unsaved_changes = any(data_hash(trip) != self.disk_hashes.get(trip.get('id')) for trip in merged) \
+            or len(merged) != len(self.disk_hashes)
+        self.update_status(f"🔄 Merged outside edits: {len(pulled)} trip(s) updated"
+                           + (f", {len(conflicts)} conflict(s) resolved" if conflicts else ""))
+        if getattr(self, 'trips_frame', None) and self.trips_frame.winfo_exists():
+            self.display_trips(self.search_var.get())
+    
     def js_to_json(self, js_str):
         """Convert JavaScript object syntax to JSON."""
         result = []
@@ -1719,6 +3825,12 @@ function getFeaturedTrips() {
     def save_trips(self):
         """Save trips to JavaScript file."""
         try:
+            # Never overwrite edits another tool made since we loaded
+            self.merge_external_changes()
+            dates_msg = self.normalize_dates_for_save()
+            if self.store:
+                self.store.save(self.trips)
+            
             # Generate JavaScript content
             js_content = self.generate_js_content()
             
@@ -1726,23 +3838,77 @@ function getFeaturedTrips() {
             if os.path.exists(TRIPS_DATA_FILE):
                 backup_path = TRIPS_DATA_FILE + '.backup'
                 shutil.copy2(TRIPS_DATA_FILE, backup_path)
+                self.mark_written(backup_path)
             
             # Write new content
             with open(TRIPS_DATA_FILE, 'w') as f:
                 f.write(js_content)
+            self.mark_written(TRIPS_DATA_FILE)
+            self.remember_disk_state(self.trips)
+            # Deleting a featured trip also drops it from the featured list
+            if self.featured_trip_ids != self.featured_on_disk:
+                self.write_featured_file()
+            if self.store:
+                self.store.set_meta('js_hash', hashlib.sha256(js_content.encode('utf-8')).hexdigest())
+            data_msg = self.publish_data_feed()
             
             # Update cache version in HTML files to force browser refresh
             cache_updated = self.update_cache_version()
             
+            # Pages embed the cache version, so build them after it is bumped
+            pages_msg = ""
+            if self.prerender_pages.get():
+                written, rebuilt, removed = build_trip_pages(self.trips)
+                for path in written:
+                    self.mark_written(path)
+                for trip_id in removed:
+                    self.mark_written(os.path.join(TRIP_PAGES_DIR, trip_id, 'index.html'))
+                pages_msg = f"\n\n📄 Trip pages: {len(rebuilt)} rebuilt, {len(self.trips) - len(rebuilt)} unchanged"
+                if removed:
+                    pages_msg += f", {len(removed)} removed"
+            
             self.unsaved_changes = False
             self.update_status("💾 Changes saved successfully!")
             
+            if self.auto_deploy.get():
+                self.git_push_changes("Update trips data")
+            
             cache_msg = "\n\n✅ Cache-busting updated in HTML files." if cache_updated else ""
             messagebox.showinfo("Success", 
-                              f"Changes saved to:\n{TRIPS_DATA_FILE}\n\nBackup created.{cache_msg}")
+                              f"Changes saved to:\n{TRIPS_DATA_FILE}\n\nBackup created.{dates_msg}{cache_msg}{data_msg}{pages_msg}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save: {e}")
     
+    def normalize_dates_for_save(self):
+        """Canonicalise every trip's availableDates and drop past batches; returns a dialog line."""
+        today = india_today()
+        expired, unreadable = 0, []
+        for trip in list(self.trips):
+            if not trip.get('availableDates'):
+                continue
+            labels, dropped, bad = normalize_trip_dates(trip['availableDates'], today)
+            expired += dropped
+            unreadable += [f"{trip.get('id')}: {label}" for label in bad]
+            if labels != trip['availableDates']:
+                # Replace rather than mutate, so undo history keeps the old dates
+                self.trips.replace(dict(trip, availableDates=labels))
+        
+        if unreadable:
+            print("Unreadable dates kept as typed:\n  " + "\n  ".join(unreadable))
+        if not expired and not unreadable:
+            return ""
+        message = f"\n\n📅 Dates: {expired} past batch(es) removed"
+        if unreadable:
+            message += f", {len(unreadable)} unreadable label(s) kept - deploy will block until fixed"
+        return message
+    
+    def publish_data_feed(self):
+        """Publish data/ for the site and app; returns a line for the save dialog."""
+        written, changed, removed = publish_trip_data(self.trips, self.featured_trip_ids)
+        for path in written + removed:
+            self.mark_written(path)
+        return f"\n\n📦 Data feed: {len(changed)} trip file(s) updated"
+    
     def update_cache_version(self):
         """Update version parameter in HTML files to bust browser cache.
         
@@ -1771,6 +3937,7 @@ function getFeaturedTrips() {
                     if new_content != content:
                         with open(html_file, 'w', encoding='utf-8') as f:
                             f.write(new_content)
+                        self.mark_written(html_file)
                         updated_count += 1
                         print(f"✅ Updated cache version in: {os.path.basename(html_file)}")
             except Exception as e:
@@ -1844,10 +4011,10 @@ function getFeaturedTrips() {
                         # Other complex arrays - use compact format
                         json_str = json.dumps(value)
                         entry += f'        {key}: {json_str},\n'
+                elif isinstance(value, bool):  # before int: bool is a subclass of int
+                    entry += f"        {key}: {'true' if value else 'false'},\n"
                 elif isinstance(value, (int, float)):
                     entry += f'        {key}: {value},\n'
-                elif isinstance(value, bool):
-                    entry += f"        {key}: {'true' if value else 'false'},\n"
                 else:
                     entry += f'        {key}: {json.dumps(value)},\n'
             
@@ -1857,6 +4024,22 @@ function getFeaturedTrips() {
         trips_js += ",\n".join(trip_entries)
         trips_js += "\n};\n\n"
         
+        # Numeric filter/sort keys, so pages and the app never re-parse display strings
+        index = build_trip_index(self.trips)
+        trips_js += "// Generated from tripsData by the Trip Manager - do not edit by hand\n"
+        trips_js += "const tripsIndex = {\n    trips: {\n"
+        trips_js += ",\n".join(f"        {json.dumps(trip_id)}: {json.dumps(facet)}"
+                                for trip_id, facet in index['trips'].items())
+        trips_js += "\n    },\n    sorted: {\n"
+        trips_js += ",\n".join(f"        {name}: {json.dumps(ids)}" for name, ids in index['sorted'].items())
+        trips_js += "\n    }\n};\n\n"
+        
+        # Homepage batches, so the browser doesn't parse date labels to build them
+        batches = build_upcoming_batches(self.trips, india_today())
+        trips_js += "const upcomingBatches = [\n"
+        trips_js += ",\n".join(f"    {json.dumps(batch, ensure_ascii=False)}" for batch in batches)
+        trips_js += "\n];\n\n"
+        
         # Add helper function
         trips_js += """function getTripData(tripId) {
     return tripsData[tripId] || tripsData['netravati'];
@@ -1914,6 +4097,13 @@ After saving your changes, deploy your website:
                                command=lambda: self.start_local_server(deploy_window))
         preview_btn.pack(pady=5)
         
+        stop_btn = tk.Button(btn_frame, text="🛑 Stop Preview",
+                            font=('Helvetica', 11),
+                            bg=COLORS['card'], fg=COLORS['text'],
+                            bd=0, padx=20, pady=8, cursor='hand2',
+                            command=self.stop_local_server)
+        stop_btn.pack(pady=5)
+        
         open_folder_btn = tk.Button(btn_frame, text="📂 Open Project Folder",
                                    font=('Helvetica', 11),
                                    bg=COLORS['card'], fg=COLORS['text'],
@@ -1922,79 +4112,113 @@ After saving your changes, deploy your website:
         open_folder_btn.pack(pady=5)
     
     def start_local_server(self, parent_window):
-        """Start a local HTTP server."""
-        import subprocess
+        """Start (or reuse) the in-process preview server and open it."""
         import webbrowser
         
         try:
-            # Start server in background
-            subprocess.Popen(
-                ['python3', '-m', 'http.server', '8080'],
-                cwd=PROJECT_ROOT,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
-            
-            # Open browser
-            webbrowser.open('http://localhost:8080')
-            
-            messagebox.showinfo("Server Started",
-                              "Local server running at:\nhttp://localhost:8080\n\n"
-                              "Close the terminal to stop the server.")
+            was_running = self.preview.running
+            url = self.preview.start()
+            webbrowser.open(url)
+            self.update_status(f"🌐 Preview at {url}")
+            if not was_running:
+                messagebox.showinfo("Server Started",
+                                  f"Local server running at:\n{url}\n\n"
+                                  "Open pages refresh automatically after you save.\n"
+                                  "Use 'Stop Preview' to stop it.", parent=parent_window)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to start server: {e}")
+            messagebox.showerror("Error", f"Failed to start server: {e}", parent=parent_window)
+    
+    def stop_local_server(self):
+        """Stop the preview server if it is running."""
+        if self.preview.running:
+            self.preview.stop()
+            self.update_status("🛑 Preview stopped")
+    
+    def on_history_shortcut(self, event):
+        """Ctrl+Z undoes, Ctrl+Y and Ctrl+Shift+Z redo, except inside text fields."""
+        # 'all' bindings run after the widget's class bindings, so a focused text
+        # field has already handled the key (its own undo, or paste for Ctrl+Y on X11)
+        if isinstance(event.widget, TEXT_INPUT_WIDGETS):
+            return None
+        shift = event.state & SHIFT_MASK
+        if event.keysym.lower() == 'y' or shift:
+            return self.redo()
+        return self.undo()
+    
+    def undo(self):
+        """Revert the most recent trip or featured-list change."""
+        entry = self.history.undo()
+        if entry:
+            self.apply_history(entry, undo=True)
+            self.update_status(f"↩️ Undone: {entry[0]}")
+        else:
+            self.update_status("Nothing to undo")
+        return 'break'
+    
+    def redo(self):
+        """Re-apply the most recently undone change."""
+        entry = self.history.redo()
+        if entry:
+            self.apply_history(entry, undo=False)
+            self.update_status(f"↪️ Redone: {entry[0]}")
+        else:
+            self.update_status("Nothing to redo")
+        return 'break'
+    
+    def apply_history(self, entry, undo):
+        """Apply one history entry backwards (undo) or forwards (redo) and refresh the view."""
+        _, kind, payload, _ = entry
+        if kind == 'trip':
+            _, before, after = payload
+            self.trips.replace(before if undo else after)
+        elif kind == 'insert':
+            index, trip = payload
+            if undo:
+                self.trips.remove(trip.get('id'))
+            else:
+                self.trips.insert(index, trip)
+        elif kind == 'delete':
+            index, trip, featured_before, featured_after = payload
+            if undo:
+                self.trips.insert(index, trip)
+            else:
+                self.trips.remove(trip.get('id'))
+            self.featured_trip_ids = list(featured_before if undo else featured_after)
+        elif kind == 'featured':
+            before, after = payload
+            self.featured_trip_ids = list(before if undo else after)
+            if getattr(self, 'featured_listbox', None) and self.featured_listbox.winfo_exists():
+                self.refresh_featured_listbox()
+                self.refresh_available_listbox()
+            self.unsaved_changes = True
+            return
+        
+        self.unsaved_changes = True
+        self.show_trip_list()
     
     def update_status(self, message):
         """Update status bar message."""
         self.status_label.config(text=message)
     
+    def mark_written(self, path):
+        """Remember a file written by the manager so deploy stages it."""
+        self.written_files.add(os.path.relpath(path, PROJECT_ROOT).replace(os.sep, '/'))
+    
     def on_close(self):
         """Handle window close."""
         if self.unsaved_changes:
             if messagebox.askyesno("Unsaved Changes",
                                   "You have unsaved changes. Save before closing?"):
                 self.save_trips()
+        self.stop_local_server()
+        if self.store:
+            self.store.close()
         self.root.destroy()
     
     def git_push_changes(self, commit_message="Updated trips"):
-        """Push changes to GitHub in background."""
-        def push_thread():
-            try:
-                # Check if git is available
-                result = subprocess.run(['git', '--version'], 
-                                       capture_output=True, text=True, 
-                                       cwd=PROJECT_ROOT)
-                if result.returncode != 0:
-                    return
-                
-                # Check for changes
-                result = subprocess.run(['git', 'status', '--porcelain'],
-                                       capture_output=True, text=True,
-                                       cwd=PROJECT_ROOT)
-                if not result.stdout.strip():
-                    return  # No changes
-                
-                # Git add
-                subprocess.run(['git', 'add', '-A'], 
-                              capture_output=True, cwd=PROJECT_ROOT)
-                
-                # Git commit
-                subprocess.run(['git', 'commit', '-m', commit_message],
-                              capture_output=True, cwd=PROJECT_ROOT)
-                
-                # Git push
-                result = subprocess.run(['git', 'push', 'origin', 'main'],
-                                       capture_output=True, text=True,
-                                       cwd=PROJECT_ROOT, timeout=120)
-                
-                if result.returncode == 0:
-                    self.root.after(0, lambda: self.update_status("☁️ Pushed to GitHub!"))
-                    
-            except Exception as e:
-                print(f"Git push error: {e}")
-        
-        thread = threading.Thread(target=push_thread, daemon=True)
-        thread.start()
+        """Queue changes for a debounced background commit and push."""
+        self.deploy_queue.submit(commit_message, self.written_files, self.trips, self.featured_trip_ids)
+        self.update_status(f"⏳ Queued for deploy: {commit_message}")
     
     def deploy_to_github(self):
         """Deploy changes to GitHub with robust error handling and auto-recovery."""
@@ -2058,81 +4282,13 @@ After saving your changes, deploy your website:
         def generate_commit_msg():
             """Generate detailed commit message based on changed files."""
             try:
-                result = subprocess.run(['git', 'status', '--porcelain'],
-                                       capture_output=True, text=True, cwd=PROJECT_ROOT)
-                if not result.stdout.strip():
+                full_msg = build_commit_message(GitStatus.read())
+                if not full_msg:
                     commit_entry.delete(0, tk.END)
                     commit_entry.insert(0, "No changes to commit")
+                    self._full_commit_msg = None
                     return
                 
-                lines = [l for l in result.stdout.strip().split('\n') if l]
-                
-                # Categorize changes
-                added = []
-                modified = []
-                deleted = []
-                
-                for line in lines:
-                    status = line[:2].strip()
-                    filepath = line[3:].strip()
-                    filename = os.path.basename(filepath)
-                    
-                    if status in ['A', '??']:
-                        added.append(filename)
-                    elif status == 'D':
-                        deleted.append(filename)
-                    else:  # M, MM, etc.
-                        modified.append(filename)
-                
-                # Build commit message
-                parts = []
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-                
-                # Detect specific changes
-                trips_changed = any('trips-data' in f for f in modified + added)
-                featured_changed = any('featured-trips' in f for f in modified + added)
-                style_changed = any(f.endswith('.css') for f in modified + added)
-                html_changed = any(f.endswith('.html') for f in modified + added)
-                js_changed = any(f.endswith('.js') and 'trips-data' not in f and 'featured-trips' not in f 
-                                for f in modified + added)
-                
-                if trips_changed:
-                    parts.append("Update trips data")
-                if featured_changed:
-                    parts.append("Update featured trips")
-                if style_changed:
-                    parts.append("Update styles")
-                if html_changed:
-                    parts.append("Update pages")
-                if js_changed:
-                    parts.append("Update scripts")
-                
-                if added:
-                    parts.append(f"Add {len(added)} file(s)")
-                if deleted:
-                    parts.append(f"Remove {len(deleted)} file(s)")
-                
-                if not parts:
-                    parts.append(f"Update {len(lines)} file(s)")
-                
-                # Create summary
-                summary = " | ".join(parts[:3])  # Max 3 parts in summary
-                
-                # Create detailed message
-                details = []
-                if modified:
-                    details.append(f"Modified: {', '.join(modified[:5])}")
-                    if len(modified) > 5:
-                        details.append(f"  ...and {len(modified) - 5} more")
-                if added:
-                    details.append(f"Added: {', '.join(added[:3])}")
-                if deleted:
-                    details.append(f"Deleted: {', '.join(deleted[:3])}")
-                
-                full_msg = f"{summary} [{timestamp}]"
-                if details:
-                    full_msg += "\n\n" + "\n".join(details)
-                
                 commit_entry.delete(0, tk.END)
                 commit_entry.insert(0, full_msg.split('\n')[0])  # Only first line in entry
                 
@@ -2181,23 +4337,9 @@ After saving your changes, deploy your website:
         
         self._deploy_log = log
         
-        def run_git_command(args, timeout=60, allow_fail=False):
-            """Run a git command and return (success, output)."""
-            try:
-                result = subprocess.run(
-                    ['git'] + args,
-                    capture_output=True, text=True,
-                    cwd=PROJECT_ROOT, timeout=timeout
-                )
-                output = (result.stdout + ' ' + result.stderr).strip()
-                success = result.returncode == 0
-                return success, output, result.returncode
-            except subprocess.TimeoutExpired:
-                return False, "Command timed out", -1
-            except FileNotFoundError:
-                return False, "Git not found", -1
-            except Exception as e:
-                return False, str(e), -1
+        git = GitRunner()
+        run_git_command = git.run
+        last_timing = git.last_timing
         
         def do_deploy():
             print("DEBUG: do_deploy() clicked!")
@@ -2205,14 +4347,35 @@ After saving your changes, deploy your website:
             log("🚀 Starting deployment...")
             log("")
             
+            # Gate: never push data the website can't render (shared with auto-deploy).
+            # The deploy commits the files on disk, so those are what gets validated
+            log("🧪 Validating trips and pages...")
+            if self.unsaved_changes:
+                log("   ⚠️ Unsaved edits are not deployed - save first to include them")
+            trips = self.read_saved_trips()
+            if trips is None:
+                ok, lines = False, [f"❌ Could not parse {os.path.relpath(TRIPS_DATA_FILE, PROJECT_ROOT)}"]
+            else:
+                ok, lines = deploy_preflight(trips, self.load_featured_trips())
+            for line in lines:
+                log(line)
+            if not ok:
+                self._deploy_btn.config(state=tk.NORMAL, text="🚀 Deploy Now")
+                return
+            log("   ✅ Validation passed")
+            log("")
+            
             def deploy_thread():
+                # Wait for any queued auto-deploy so git operations never overlap
+                with self.deploy_queue.lock:
+                    run_deploy()
+            
+            def run_deploy():
+                git.timings.clear()
+                deploy_start = time.perf_counter()
                 try:
-                    # Use full commit message if available, otherwise use entry text
                     user_msg = self._commit_entry.get().strip()
-                    if hasattr(self, '_full_commit_msg') and self._full_commit_msg:
-                        commit_msg = self._full_commit_msg
-                    else:
-                        commit_msg = user_msg or f"Updated - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+                    auto_msg = self._full_commit_msg
                     
                     # Step 1: Verify git repository
                     log("📂 Step 1/7: Verifying Git repository...")
@@ -2233,44 +4396,66 @@ After saving your changes, deploy your website:
                     remote_url = output.split('\n')[0] if output else 'unknown'
                     log(f"   ✅ Remote: {remote_url.split()[1] if len(remote_url.split()) > 1 else 'configured'}")
                     
-                    # Step 3: Check for uncommitted changes and build detailed message
+                    # Step 3: One status call feeds the commit message and the staging decision
                     log("🔍 Step 3/7: Analyzing changes...")
-                    success, output, _ = run_git_command(['status', '--porcelain'])
+                    try:
+                        status = GitStatus.read()
+                    except RuntimeError as e:
+                        log(f"❌ git status failed: {e}")
+                        return
+                    git.timings.append(('status', status.elapsed))
+                    log(f"   ⏱️ git status {status.elapsed:.2f}s")
                     
-                    if not output.strip():
+                    to_stage = status.paths_to_stage(self.written_files)
+                    stage_set = set(to_stage)
+                    skipped = [path for _, path in status.changes if path not in stage_set]
+                    
+                    if not to_stage:
                         log("   ⚠️ No local changes to deploy")
+                        if skipped:
+                            log(f"   ℹ️ {len(skipped)} other changed file(s) left unstaged")
                         log("")
                         log("   Checking if we're ahead of remote...")
-                        success, ahead_output, _ = run_git_command(['rev-list', '--count', 'origin/main..HEAD'])
-                        if success and ahead_output.strip() != '0':
-                            log(f"   📤 Found {ahead_output.strip()} unpushed commit(s)")
+                        if status.ahead is not None:
+                            ahead = status.ahead
+                        else:
+                            success, ahead_output, _ = run_git_command(['rev-list', '--count', 'origin/main..HEAD'])
+                            ahead = int(ahead_output.strip()) if success and ahead_output.strip().isdigit() else 0
+                        if ahead:
+                            log(f"   📤 Found {ahead} unpushed commit(s)")
                         else:
                             log("   ✅ Already up to date with remote!")
                             self._deploy_win.after(0, lambda: self._deploy_btn.config(state=tk.NORMAL, text="🚀 Deploy Now"))
                             return
                     else:
-                        # Parse and display changed files
-                        lines = [l for l in output.strip().split('\n') if l]
-                        log(f"   📁 Found {len(lines)} changed file(s):")
+                        # Display changed files
+                        log(f"   📁 Found {len(to_stage)} changed file(s):")
                         
-                        # Categorize and show changes
-                        for line in lines[:10]:  # Show first 10
-                            status = line[:2].strip()
-                            filepath = line[3:].strip()
-                            status_icon = {'M': '📝', 'A': '➕', 'D': '🗑️', '??': '🆕'}.get(status, '📄')
-                            status_text = {'M': 'Modified', 'A': 'Added', 'D': 'Deleted', '??': 'New'}.get(status, 'Changed')
+                        for code, filepath in [c for c in status.changes if c[1] in stage_set][:10]:  # Show first 10
+                            status_icon = {'M': '📝', 'A': '➕', 'D': '🗑️', '??': '🆕'}.get(code, '📄')
+                            status_text = {'M': 'Modified', 'A': 'Added', 'D': 'Deleted', '??': 'New'}.get(code, 'Changed')
                             log(f"      {status_icon} {status_text}: {filepath}")
                         
-                        if len(lines) > 10:
-                            log(f"      ... and {len(lines) - 10} more files")
+                        if len(to_stage) > 10:
+                            log(f"      ... and {len(to_stage) - 10} more files")
+                        if skipped:
+                            log(f"   ℹ️ Skipping {len(skipped)} file(s) not written by Trip Manager")
                     
-                    # Step 4: Stash any uncommitted changes before fetch (safety)
+                    # Use the refreshed auto message unless the user typed their own
+                    if auto_msg and user_msg == auto_msg.split('\n')[0]:
+                        staged_status = GitStatus()
+                        staged_status.changes = [c for c in status.changes if c[1] in stage_set]
+                        commit_msg = build_commit_message(staged_status) or auto_msg
+                    else:
+                        commit_msg = user_msg or f"Updated - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+                    
+                    # Step 4: Stage only what the manager wrote, then commit
                     log("💾 Step 4/7: Staging and committing changes...")
-                    # Stage all changes first
-                    success, output, _ = run_git_command(['add', '-A'])
-                    if not success:
-                        log(f"   ⚠️ Staging warning: {output}")
-                    log("   ✅ Changes staged")
+                    if to_stage:
+                        success, output, _ = run_git_command(['add', '-A', '--'] + to_stage)
+                        if not success:
+                            log(f"   ⚠️ Staging warning: {output}")
+                        log(f"   ✅ Changes staged {last_timing()}")
                     
                     # Show commit message summary
                     commit_summary = commit_msg.split('\n')[0]  # First line only
@@ -2287,23 +4472,39 @@ After saving your changes, deploy your website:
                         else:
                             log(f"   ⚠️ Commit note: {output[:100]}")
                     else:
-                        log("   ✅ Changes committed successfully")
+                        log(f"   ✅ Changes committed successfully {last_timing()}")
                     
-                    # Step 5: Fetch latest from remote
+                    # Step 5: Fetch latest from remote (skipped when we already have its tip)
                     log("📥 Step 5/7: Fetching latest from remote...")
-                    success, output, _ = run_git_command(['fetch', 'origin', 'main'], timeout=60)
-                    if not success:
-                        log(f"   ⚠️ Fetch warning: {output[:100]}")
-                        log("   Continuing anyway...")
+                    success, output, _ = run_git_command(['ls-remote', 'origin', 'refs/heads/main'], timeout=30)
+                    remote_tip = output.split()[0] if success and output else ''
+                    if remote_tip and run_git_command(['cat-file', '-e', f'{remote_tip}^{{commit}}'])[0]:
+                        run_git_command(['update-ref', 'refs/remotes/origin/main', remote_tip])
+                        log(f"   ✅ Remote tip {remote_tip[:7]} already local - fetch skipped")
                     else:
-                        log("   ✅ Fetched latest changes")
+                        success, output, _ = run_git_command(fetch_args(), timeout=60)
+                        if not success:
+                            log(f"   ⚠️ Fetch warning: {output[:100]}")
+                            log("   Continuing anyway...")
+                        else:
+                            log(f"   ✅ Fetched latest changes {last_timing()}")
+                    
+                    # A shallow clone may not reach back to where local and remote diverged
+                    if not run_git_command(['merge-base', 'HEAD', 'origin/main'])[0]:
+                        unshallow = fetch_args(unshallow=True)
+                        if '--unshallow' in unshallow:
+                            log("   📜 Fetching full history to find the merge base...")
+                            run_git_command(unshallow, timeout=300)
                     
                     # Step 6: Rebase onto remote (handles diverged histories)
                     log("🔄 Step 6/7: Rebasing local changes...")
                     
-                    # Check if we need to rebase
-                    success, behind_output, _ = run_git_command(['rev-list', '--count', 'HEAD..origin/main'])
-                    behind_count = int(behind_output.strip()) if success and behind_output.strip().isdigit() else 0
+                    # Nothing to rebase when the remote tip is already part of our history
+                    if run_git_command(['merge-base', '--is-ancestor', 'origin/main', 'HEAD'])[0]:
+                        behind_count = 0
+                    else:
+                        success, behind_output, _ = run_git_command(['rev-list', '--count', 'HEAD..origin/main'])
+                        behind_count = int(behind_output.strip()) if success and behind_output.strip().isdigit() else 0
                     
                     if behind_count > 0:
                         log(f"   📥 Remote has {behind_count} new commit(s)")
@@ -2341,9 +4542,9 @@ After saving your changes, deploy your website:
                                 # Abort any in-progress rebase
                                 run_git_command(['rebase', '--abort'])
                         else:
-                            log("   ✅ Rebased successfully")
+                            log(f"   ✅ Rebased successfully {last_timing()}")
                     else:
-                        log("   ✅ Already up to date with remote")
+                        log("   ✅ Remote tip already in local history - rebase skipped")
                     
                     # Step 7: Push to remote
                     log("☁️ Step 7/7: Pushing to GitHub...")
@@ -2391,8 +4592,9 @@ After saving your changes, deploy your website:
                     if 'up-to-date' in output_lower or 'everything up-to-date' in output_lower:
                         log("   ✅ Already up to date!")
                     else:
-                        log("   ✅ Pushed successfully!")
+                        log(f"   ✅ Pushed successfully! {last_timing()}")
                     
+                    self.written_files.clear()
                     log("")
                     log("═" * 45)
                     log("🎉 DEPLOYMENT SUCCESSFUL!")
@@ -2408,6 +4610,8 @@ After saving your changes, deploy your website:
                     import traceback
                     log(traceback.format_exc())
                 finally:
+                    if git.timings:
+                        log(git.summary(time.perf_counter() - deploy_start))
                     self._deploy_win.after(0, lambda: self._deploy_btn.config(state=tk.NORMAL, text="🚀 Deploy Now"))
             
             threading.Thread(target=deploy_thread, daemon=True).start()
@@ -2416,7 +4620,29 @@ After saving your changes, deploy your website:
         deploy_btn.config(command=do_deploy)
 
 
+def check_trip_pages():
+    """CI check: exit status 1 when the committed trip pages are stale."""
+    reader = TripManagerApp.__new__(TripManagerApp)
+    reader.parsed_blocks = {}
+    with open(TRIPS_DATA_FILE, 'r', encoding='utf-8') as f:
+        trips = reader.parse_trips_content(f.read())
+    if trips is None:
+        print(f"❌ Could not parse {os.path.relpath(TRIPS_DATA_FILE, PROJECT_ROOT)}")
+        return 1
+    stale = stale_trip_pages(trips)
+    if stale:
+        print(f"❌ {len(stale)} pre-rendered trip page(s) out of date with js/trips-data.js:")
+        for trip_id in stale:
+            print(f"   {trip_id}")
+        print("   Save in the Trip Manager with 'Pre-render trip pages' on, then commit trips/.")
+        return 1
+    print(f"✅ {len(trips)} pre-rendered trip pages match js/trips-data.js")
+    return 0
+
+
 def main():
+    if sys.argv[1:] == ['--check-pages']:
+        sys.exit(check_trip_pages())
     root = tk.Tk()
     app = TripManagerApp(root)
     root.mainloop()
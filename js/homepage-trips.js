@@ -10,7 +10,10 @@
         const grid = document.getElementById('upcoming-batches-grid');
         if (!grid || typeof TripDateUtils === 'undefined') return;
 
-        const batches = TripDateUtils.buildUpcomingBatches(getAllTrips(), referenceDate, 3);
+        // trips-data.js ships the batches precomputed by the Trip Manager
+        const batches = typeof upcomingBatches !== 'undefined'
+            ? TripDateUtils.selectUpcomingBatches(upcomingBatches, referenceDate, 3)
+            : TripDateUtils.buildUpcomingBatches(getAllTrips(), referenceDate, 3);
         const escapeHTML = TripDateUtils.escapeHTML;
 
         if (batches.length === 0) {
@@ -303,11 +303,22 @@
             .slice(0, batchLimit);
     }
 
+    function selectUpcomingBatches(batches, referenceDate, limit) {
+        const batchLimit = Number.isInteger(limit) && limit > 0 ? limit : 3;
+        const today = getIndiaTodayTimestamp(referenceDate);
+
+        // Batches precomputed at save carry numeric start/end timestamps
+        return (Array.isArray(batches) ? batches : [])
+            .filter(batch => batch && Number(batch.end) >= today)
+            .slice(0, batchLimit);
+    }
+
     return {
         parseTripDateRange,
         getUpcomingDateRanges,
         getTripDateTags,
         buildUpcomingBatches,
+        selectUpcomingBatches,
         renderTripDateTags,
         escapeHTML
     };
@@ -0,0 +1,113 @@
+"""
+Google Maps review payload parsing
+Reads reviews out of the review XHR responses; no browser needed, so it is testable on its own
+"""
+
+import json
+from datetime import datetime, timezone
+
+# XHR endpoints Google Maps loads reviews from; bodies are JSON behind a )]}' prefix
+REVIEW_RESPONSE_PATTERNS = ('/maps/rpc/listugcposts', '/maps/preview/review/listentitiesreviews')
+# Index paths to each field in a review payload, tried in order; 'list' leads to the
+# reviews and 'item' into one of them. A layout counts only if it yields a name and rating
+REVIEW_PAYLOAD_LAYOUTS = [
+    {  # listugcposts
+        'list': (2,), 'item': (0,), 'review_id': (0,), 'name': (1, 4, 5, 0),
+        'reviewer_photo': (1, 4, 5, 1), 'date': (1, 6), 'timestamp': (1, 2),
+        'rating': (2, 0, 0), 'text': (2, 15, 0, 0)
+    },
+    {  # listentitiesreviews (older layout)
+        'list': (2,), 'item': (), 'review_id': (10,), 'name': (0, 1),
+        'reviewer_photo': (0, 2), 'date': (1,), 'timestamp': (27,),
+        'rating': (4,), 'text': (3,)
+    },
+]
+
+class ReviewResponseParser:
+    """Collects reviews from the review XHR responses as the page loads them"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.reviews = []
+        self.responses = 0
+        self.unparsed = 0
+        self._seen = set()
+
+    def attach(self, page):
+        page.on('response', self._on_response)
+
+    async def _on_response(self, response):
+        if not is_review_response(response.url):
+            return
+        self.responses += 1
+        try:
+            reviews = parse_review_payload(await response.text())
+        except Exception:
+            reviews = []
+        if not reviews:
+            self.unparsed += 1
+            return
+        for review in reviews:
+            key = review.get('review_id') or (review['name'], review.get('text'))
+            if key not in self._seen:
+                self._seen.add(key)
+                self.reviews.append(review)
+
+    def has_enough(self):
+        return len(self.reviews) >= self.limit
+
+def is_review_response(url):
+    return any(pattern in url for pattern in REVIEW_RESPONSE_PATTERNS)
+
+def dig(data, path):
+    """Follow list indexes into a nested payload, or None when the shape does not match"""
+    for i in path:
+        if not isinstance(data, list) or not -len(data) <= i < len(data):
+            return None
+        data = data[i]
+    return data
+
+def epoch_to_iso(value):
+    """ISO UTC time from an epoch in seconds, milliseconds or microseconds"""
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+        return None
+    while value > 1e11:  # Later than year 5138 in seconds: ms or us
+        value /= 1000
+    return datetime.fromtimestamp(value, timezone.utc).isoformat(timespec='seconds')
+
+def payload_review(item, layout):
+    """One review dict from a payload entry, or None if the layout does not fit it"""
+    name = dig(item, layout['name'])
+    rating = dig(item, layout['rating'])
+    if not isinstance(name, str) or not name.strip():
+        return None
+    if not isinstance(rating, int) or isinstance(rating, bool) or not 1 <= rating <= 5:
+        return None
+    review = {'name': name.strip(), 'rating': rating}
+    for field in ('text', 'date', 'reviewer_photo', 'review_id'):
+        value = dig(item, layout[field])
+        if isinstance(value, str) and value.strip():
+            review[field] = value.strip()
+    if review.get('reviewer_photo', '').startswith('//'):
+        review['reviewer_photo'] = 'https:' + review['reviewer_photo']
+    published_at = epoch_to_iso(dig(item, layout['timestamp']))
+    if published_at:
+        review['published_at'] = published_at
+    return review
+
+def parse_review_payload(body):
+    """Reviews in one review XHR body, or [] when no known layout fits"""
+    if body.startswith(")]}'"):
+        body = body[body.find('\n') + 1:]
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return []
+    for layout in REVIEW_PAYLOAD_LAYOUTS:
+        items = dig(data, layout['list'])
+        if not isinstance(items, list):
+            continue
+        reviews = [review for review in (payload_review(dig(item, layout['item']), layout) for item in items) if review]
+        if reviews:
+            return reviews
+    return []
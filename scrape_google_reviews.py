@@ -4,23 +4,592 @@ Google Maps Reviews & Photos Scraper
 Uses Playwright with stealth mode to extract reviews and photos from Google Maps
 """
 
+import argparse
 import asyncio
+import calendar
+import hashlib
 import json
 import os
+import random
 import re
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 from playwright_stealth import Stealth
+from review_payloads import ReviewResponseParser
 
 # Configuration
 GOOGLE_MAPS_URL = "https://www.google.com/maps/search/Team+Weekend+Trekkers+Bangalore"
 OUTPUT_FILE = "reviews_data.json"
+SITE_OUTPUT_FILE = "reviews_data.min.json"  # Minified payload for the website
+STREAM_FILE = "reviews_stream.jsonl"  # Append-only log written during scraping
+ROTATED_STREAM_FILE = STREAM_FILE + ".1"  # The stream as of the last publish (one generation kept)
+TRACE_FILE = "scrape_trace.zip"  # Playwright trace, written only with --trace
+SELECTOR_HEALTH_FILE = "selector_health.json"  # Which fallback selector last worked per field
+FIXTURE_DIR = "tests/fixtures/google-maps"  # Offline fixture written by --record, served by --replay
+FIXTURE_HAR = "session.har"  # Every response of the recorded run, bodies embedded
+FIXTURE_DOM = "reviews.html"  # Page DOM just before extraction (used by tests/benchmark-scraper.py)
+FIXTURE_INFO = "fixture.json"  # When and from where the fixture was recorded
+REPLAY_STREAM_FILE = "replay_stream.jsonl"  # Stream of a replayed run, kept inside the fixture dir
+
+# Daemon mode (--daemon)
+DAEMON_INTERVAL_MINUTES = 360
+DAEMON_JITTER = 0.2  # +/- fraction applied to every sleep
+BACKOFF_BASE_SECONDS = 300
+BACKOFF_MAX_SECONDS = 6 * 3600
+# Fields that define the published content (scraped_at and metrics change every run)
+CONTENT_FIELDS = ('business_name', 'rating', 'total_reviews', 'reviews', 'photos')
+VOLATILE_REVIEW_FIELDS = ('date',)  # "a week ago" drifts as time passes; published_on does not
 MAX_REVIEWS = 10
 SCROLL_PAUSE_TIME = 2000  # ms
+SITE_REVIEW_FIELDS = ('name', 'rating', 'text', 'date', 'published_on', 'reviewer_photo')
+
+# Relative review dates ("a week ago", "Edited 4 months ago") turned into published_on
+RELATIVE_DATE_PATTERN = r'(a|an|one|\d+)\s+(minute|hour|day|week|month|year)s?\s+ago'
+REVIEW_TIMEZONE = timezone(timedelta(hours=5, minutes=30))  # Asia/Kolkata, as the browser context and scraped_at
+REVIEW_IDENTITY_TEXT_CHARS = 60  # Text prefix that identifies a review without an id (DOM text is truncated)
+MAX_PHOTOS = 40
+PHOTO_SCROLLS = 5
+DEBUG_SCREENSHOT = "debug_screenshot.png"
+
+# Low-memory profile (--low-memory) for small servers
+LOW_MEMORY_VIEWPORT = {'width': 800, 'height': 600}
+LOW_MEMORY_BROWSER_ARGS = [
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--mute-audio',
+    '--no-first-run',
+    '--renderer-process-limit=1',
+    '--js-flags=--max-old-space-size=256'
+]
+LOW_MEMORY_BLOCKED_RESOURCES = ('media', 'font')  # Never needed for reviews or photo URLs
+
+# Candidate selectors per review field, tried healthiest-first (see SelectorHealth)
+REVIEW_FIELD_SELECTORS = {
+    'name': ['.d4r55', '.WNxzHc', '[class*="name"]', '.Vpc5Fe'],
+    'rating': ['.kvMYJc', '[aria-label*="star"]', '.DU9Pgb', '.fzvQIb'],
+    'text': ['.wiI7pd', '.MyEned', '.Jtu6Td', '[class*="text"]', '.review-text'],
+    'date': ['.rsqaWe', '.DU9Pgb', '[class*="date"]', '.dehysf'],
+    'reviewer_photo': ['.NBa7we', 'img[class*="photo"]', '.lDY1rd img'],
+}
+# Fields every review should have; a miss on these is reported as breakage
+REQUIRED_REVIEW_FIELDS = ('name', 'rating', 'date')
+
+# Photo thumbnails, gallery images and any googleusercontent image on the page
+PHOTO_SELECTORS = [
+    '.U39Pmb',
+    '.Uf0tqf img',
+    '[class*="gallery"] img',
+    '.m6QErb img',
+    'img[src*="googleusercontent"]'
+]
+PHOTO_SCROLL_SELECTORS = ['.m6QErb.DxyBCb', '.m6QErb[aria-label]', 'div[role="main"]']
+
+# Scrolls the first matching gallery container and returns how many images are loaded
+PHOTO_SCROLL_JS = """
+(selectors) => {
+    for (const selector of selectors) {
+        const gallery = document.querySelector(selector);
+        if (gallery) {
+            gallery.scrollTop = gallery.scrollHeight;
+            break;
+        }
+    }
+    return document.querySelectorAll('img[src*="googleusercontent"]').length;
+}
+"""
+
+# Returns unique high-res URLs from src, data-src or background-image of matching elements
+PHOTO_EXTRACT_JS = """
+(selectors) => {
+    const urls = new Set();
+    for (const el of document.querySelectorAll(selectors.join(','))) {
+        const background = (el.style && el.style.backgroundImage || '').match(/url\\(["']?([^"')]+)/);
+        const src = el.getAttribute('src') || el.getAttribute('data-src') || (background && background[1]);
+        if (!src || !src.includes('googleusercontent')) continue;
+        urls.add(src.replace(/=w\\d+-h\\d+/, '=w800-h600').replace(/=s\\d+/, '=s800'));
+    }
+    return Array.from(urls);
+}
+"""
+
+# Chromium performance counters copied into the metrics as page memory
+PAGE_MEMORY_METRICS = ('JSHeapUsedSize', 'JSHeapTotalSize', 'Nodes', 'Documents', 'JSEventListeners')
+# Awaitable page/element methods that do not talk to the browser
+LOCAL_WAIT_METHODS = {'wait_for_timeout'}
+
+class ConsentWallError(Exception):
+    """Google kept the page on its consent screen"""
+
+def process_tree_rss():
+    """Resident bytes of this process and all its descendants, or None where /proc is missing"""
+    try:
+        pids = [int(entry) for entry in os.listdir('/proc') if entry.isdigit()]
+    except OSError:
+        return None
+    children = {}
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                parent = int(f.read().rsplit(b')', 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(parent, []).append(pid)
+    tree, pending = [], [os.getpid()]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, []))
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    for pid in tree:
+        try:
+            with open(f'/proc/{pid}/statm', 'r') as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+class ScrapeMetrics:
+    """Per-phase wall-clock timings, awaited Playwright calls, bytes received and page memory"""
+    
+    def __init__(self):
+        self.run_start = time.perf_counter()
+        self.playwright_calls = 0
+        self.bytes_received = 0
+        self.responses = 0
+        self.page_memory = {}
+        self.peak_rss = 0
+        self.phases = {}
+        self._phase = None
+        self._phase_start = 0.0
+        self._phase_calls = 0
+        self._phase_bytes = 0
+    
+    def start_phase(self, name):
+        """Close the running phase (if any) and start timing a new one"""
+        self.end_phase()
+        self._phase = name
+        self._phase_start = time.perf_counter()
+        self._phase_calls = self.playwright_calls
+        self._phase_bytes = self.bytes_received
+    
+    def end_phase(self):
+        """Record the running phase"""
+        self.sample_rss()
+        if self._phase is None:
+            return
+        self.phases[self._phase] = {
+            'seconds': round(time.perf_counter() - self._phase_start, 3),
+            'playwright_calls': self.playwright_calls - self._phase_calls,
+            'bytes_received': self.bytes_received - self._phase_bytes
+        }
+        self._phase = None
+    
+    async def attach(self, context, page):
+        """Count network bytes and enable performance counters through a CDP session"""
+        try:
+            cdp = await context.new_cdp_session(page)
+            await cdp.send('Network.enable')
+            await cdp.send('Performance.enable')
+            cdp.on('Network.loadingFinished', self._on_loading_finished)
+            return cdp
+        except Exception as e:
+            print(f"    Metrics unavailable: {e}")
+            return None
+    
+    def sample_rss(self):
+        """Track the peak resident memory of the scraper and its browser processes"""
+        rss = process_tree_rss()
+        if rss:
+            self.peak_rss = max(self.peak_rss, rss)
+
+    def _on_loading_finished(self, event):
+        self.responses += 1
+        self.bytes_received += int(event.get('encodedDataLength', 0))
+    
+    async def sample_memory(self, cdp):
+        """Snapshot the page's JS heap and DOM counters"""
+        if cdp is None:
+            return
+        try:
+            response = await cdp.send('Performance.getMetrics')
+            for metric in response.get('metrics', []):
+                if metric['name'] in PAGE_MEMORY_METRICS:
+                    self.page_memory[metric['name']] = int(metric['value'])
+        except Exception as e:
+            print(f"    Memory sample failed: {e}")
+    
+    def as_dict(self):
+        self.end_phase()
+        return {
+            'total_seconds': round(time.perf_counter() - self.run_start, 3),
+            'playwright_calls': self.playwright_calls,
+            'bytes_received': self.bytes_received,
+            'responses': self.responses,
+            'page_memory': self.page_memory,
+            'peak_rss_mb': round(self.peak_rss / 1024 / 1024, 1) if self.peak_rss else None,
+            'phases': self.phases
+        }
+    
+    def print_summary(self):
+        data = self.as_dict()
+        print(f"Timing: {data['total_seconds']}s total, {data['playwright_calls']} Playwright calls, "
+              f"{data['bytes_received'] / 1024:.0f} KB received")
+        if data['peak_rss_mb']:
+            print(f"Peak RSS: {data['peak_rss_mb']} MB (scraper and browser processes)")
+        for name, phase in data['phases'].items():
+            print(f"  {name:<14} {phase['seconds']:>8.3f}s  {phase['playwright_calls']:>5} calls")
+
+class PlaywrightCallCounter:
+    """Wraps a Playwright page or element handle and counts each awaited call"""
+    
+    def __init__(self, target, metrics):
+        self._target = target
+        self._metrics = metrics
+    
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name in LOCAL_WAIT_METHODS or not asyncio.iscoroutinefunction(attr):
+            return attr
+        
+        async def counted(*args, **kwargs):
+            self._metrics.playwright_calls += 1
+            return self._wrap(await attr(*args, **kwargs))
+        return counted
+    
+    def _wrap(self, result):
+        if type(result).__name__ == 'ElementHandle':
+            return PlaywrightCallCounter(result, self._metrics)
+        if isinstance(result, list) and result and type(result[0]).__name__ == 'ElementHandle':
+            return [PlaywrightCallCounter(el, self._metrics) for el in result]
+        return result
+
+class SelectorHealth:
+    """Persisted record of which candidate selector last matched for each field"""
+    
+    def __init__(self, path=SELECTOR_HEALTH_FILE):
+        self.path = path
+        self.fields = {}
+        self.run_hits = {}
+        self.run_misses = {}
+        self._reported = set()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.fields = json.load(f).get('fields', {})
+        except (FileNotFoundError, ValueError):
+            self.fields = {}
+    
+    def ordered(self, field, candidates):
+        """Return candidates with the last working selector first, then by hit count"""
+        stats = self.fields.get(field, {})
+        preferred = stats.get('preferred')
+        hits = stats.get('hits', {})
+        return sorted(candidates, key=lambda sel: (sel != preferred, -hits.get(sel, 0)))
+    
+    def record_hit(self, field, selector):
+        stats = self.fields.setdefault(field, {'preferred': None, 'hits': {}, 'failures': 0})
+        stats['preferred'] = selector
+        stats['hits'][selector] = stats['hits'].get(selector, 0) + 1
+        stats['last_success'] = datetime.now().isoformat()
+        self.run_hits[field] = self.run_hits.get(field, 0) + 1
+    
+    def record_miss(self, field, candidates, report=True):
+        stats = self.fields.setdefault(field, {'preferred': None, 'hits': {}, 'failures': 0})
+        stats['failures'] += 1
+        self.run_misses[field] = self.run_misses.get(field, 0) + 1
+        if report and field not in self._reported:
+            self._reported.add(field)
+            print(f"  ⚠️ All selectors failed for '{field}': {', '.join(candidates)}")
+    
+    def broken_fields(self):
+        """Fields that missed during this run without a single hit"""
+        return sorted(f for f in self.run_misses if not self.run_hits.get(f))
+    
+    def save(self):
+        try:
+            write_json_atomic(self.path, {
+                'updated_at': datetime.now().isoformat(),
+                'fields': self.fields
+            }, indent=2)
+        except OSError as e:
+            print(f"  Could not save selector health: {e}")
+    
+    def print_report(self):
+        broken = self.broken_fields()
+        if broken:
+            print(f"⚠️ Selectors broken this run: {', '.join(broken)}")
+        else:
+            print("Selectors: all fields matched")
+
+async def query_field(scope, field, candidates, health, extract=None, report=True):
+    """Return the first non-empty value for a field, trying the healthiest selector first.
+    
+    extract(el) turns the matched element into a value; without it the element is returned.
+    """
+    for sel in health.ordered(field, candidates):
+        try:
+            el = await scope.query_selector(sel)
+            value = (await extract(el) if extract else el) if el else None
+        except Exception:
+            continue
+        if value not in (None, ''):
+            health.record_hit(field, sel)
+            return value
+    health.record_miss(field, candidates, report=report)
+    return None
 
-async def scroll_reviews_feed(page, scroll_container, num_scrolls=5):
-    """Scroll the reviews feed to load more reviews"""
+async def click_field(page, field, candidates, health, wait_ms=2000, report=True):
+    """Click the first matching element for a field and wait for the UI to settle"""
+    async def click(el):
+        await el.click()
+        await page.wait_for_timeout(wait_ms)
+        return True
+    return await query_field(page, field, candidates, health, extract=click, report=report)
+
+async def read_text(el):
+    return await el.inner_text()
+
+async def read_star_rating(el):
+    """Read a rating from an aria-label like '5 stars' or by counting filled stars"""
+    aria_label = await el.get_attribute('aria-label')
+    if aria_label:
+        match = re.search(r'(\d+)', aria_label)
+        if match:
+            return int(match.group(1))
+    stars = await el.query_selector_all('.hCCjke, .vzX5Ic, [class*="star"]')
+    return len(stars) if stars else None
+
+async def read_photo_src(el):
+    src = await el.get_attribute('src')
+    return src if src and not src.startswith('data:') else None
+
+def open_stream(scraped_at, stream_file=STREAM_FILE):
+    """Open the JSONL stream and mark the start of a new run"""
+    stream = open(stream_file, 'a', encoding='utf-8')
+    stream_record(stream, 'run', {'scraped_at': scraped_at})
+    return stream
+
+def stream_record(stream, kind, data):
+    """Append one record to the stream and flush it to disk immediately"""
+    if stream is None:
+        return
+    stream.write(json.dumps({'type': kind, 'data': data}, ensure_ascii=False) + '\n')
+    stream.flush()
+    os.fsync(stream.fileno())
+
+def compact_stream(stream_file=STREAM_FILE):
+    """Rebuild the results dict from the records of the last run in the stream"""
+    results = None
+    seen_reviews = set()
+    seen_photos = set()
+    
+    if not os.path.exists(stream_file):
+        return None
+    
+    with open(stream_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Partial line from an interrupted write
+            
+            kind = record.get('type')
+            data = record.get('data') or {}
+            if kind == 'run':
+                results = {
+                    "business_name": "",
+                    "rating": "",
+                    "total_reviews": "",
+                    "reviews": [],
+                    "photos": [],
+                    "scraped_at": data.get('scraped_at', '')
+                }
+                seen_reviews.clear()
+                seen_photos.clear()
+            elif results is None:
+                continue
+            elif kind == 'meta':
+                results.update(data)
+            elif kind == 'metrics':
+                results['metrics'] = data
+            elif kind == 'review':
+                key = (data.get('name'), data.get('text'))
+                if key not in seen_reviews:
+                    seen_reviews.add(key)
+                    results['reviews'].append(data)
+            elif kind == 'photo':
+                url = data.get('url')
+                if url and url not in seen_photos:
+                    seen_photos.add(url)
+                    results['photos'].append(url)
+    
+    return results
+
+def stream_run_error(stream_file=STREAM_FILE):
+    """How the last run in the stream ended: None if cleanly, else its error ('incomplete' without an end record)"""
+    error = 'incomplete'
+    with open(stream_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('type') == 'run':
+                error = 'incomplete'
+            elif record.get('type') == 'end':
+                error = (record.get('data') or {}).get('error')
+    return error
+
+def rotate_stream(stream_file=STREAM_FILE, rotated_file=ROTATED_STREAM_FILE):
+    """Move a fully published stream aside so the next compaction starts from an empty file"""
+    try:
+        os.replace(stream_file, rotated_file)
+    except FileNotFoundError:
+        pass
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Write JSON to a temp file and rename it over the target"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+    os.replace(tmp_path, path)
+
+def write_outputs(results):
+    """Write the compacted JSON and the minified site-ready payload"""
+    write_json_atomic(OUTPUT_FILE, results, indent=2)
+    
+    site_payload = {
+        "business_name": results.get('business_name', ''),
+        "rating": results.get('rating', ''),
+        "total_reviews": results.get('total_reviews', ''),
+        "reviews": [
+            {k: review[k] for k in SITE_REVIEW_FIELDS if review.get(k) not in (None, '')}
+            for review in results.get('reviews', [])
+        ],
+        "photos": results.get('photos', []),
+        "scraped_at": results.get('scraped_at', '')
+    }
+    write_json_atomic(SITE_OUTPUT_FILE, site_payload, separators=(',', ':'))
+
+def shift_months(day, months):
+    """The same day `months` earlier, clamped to the end of a shorter month"""
+    year, month = divmod(day.year * 12 + day.month - 1 - months, 12)
+    return day.replace(year=year, month=month + 1, day=min(day.day, calendar.monthrange(year, month + 1)[1]))
+
+def relative_to_iso_date(text, scraped_at):
+    """ISO date for a relative review date like "3 weeks ago" seen at scraped_at, or None"""
+    try:
+        reference = datetime.fromisoformat(scraped_at)
+    except (TypeError, ValueError):
+        return None
+    if reference.tzinfo:
+        reference = reference.astimezone(REVIEW_TIMEZONE)
+    text = (text or '').strip().lower()
+    if text in ('just now', 'today'):
+        return reference.date().isoformat()
+    if text == 'yesterday':
+        return (reference - timedelta(days=1)).date().isoformat()
+    match = re.search(RELATIVE_DATE_PATTERN, text)
+    if not match:
+        return None
+    count = 1 if match[1] in ('a', 'an', 'one') else int(match[1])
+    unit = match[2]
+    if unit in ('month', 'year'):
+        return shift_months(reference.date(), count * (12 if unit == 'year' else 1)).isoformat()
+    return (reference - timedelta(**{unit + 's': count})).date().isoformat()
+
+def review_identity(review):
+    """Keys a review is known by across runs: its id, and its author with the start of its text"""
+    keys = [('id', review['review_id'])] if review.get('review_id') else []
+    text = re.sub(r'\s+', ' ', review.get('text') or '').rstrip('…. ')[:REVIEW_IDENTITY_TEXT_CHARS]
+    keys.append(('author', review.get('name', ''), text))
+    return keys
+
+def date_reviews(results, previous=None):
+    """Give every review an absolute published_on date; returns how many have one.
+    
+    A payload timestamp is exact and always wins. Otherwise a date already published
+    for the same review is kept, since it was worked out when the relative date was
+    finer ("a week ago" rather than "2 months ago"); new reviews get one from their
+    relative date and scraped_at.
+    """
+    known = {}
+    for review in (previous or {}).get('reviews', []):
+        if review.get('published_on'):
+            for key in review_identity(review):
+                known.setdefault(key, review['published_on'])
+    
+    dated = 0
+    for review in results.get('reviews', []):
+        published_on = None
+        if review.get('published_at'):
+            try:
+                published_on = datetime.fromisoformat(review['published_at']).astimezone(REVIEW_TIMEZONE).date().isoformat()
+            except ValueError:
+                pass
+        if not published_on:
+            published_on = next((known[key] for key in review_identity(review) if key in known), None)
+        if not published_on:
+            published_on = relative_to_iso_date(review.get('date'), results.get('scraped_at'))
+        if published_on:
+            review['published_on'] = published_on
+            dated += 1
+    return dated
+
+def content_hash(results):
+    """Hash of the published fields, independent of when the scrape ran"""
+    content = {k: results.get(k) for k in CONTENT_FIELDS}
+    content['reviews'] = [
+        {k: v for k, v in review.items() if k not in VOLATILE_REVIEW_FIELDS}
+        for review in content['reviews'] or []
+    ]
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def load_published():
+    """The current OUTPUT_FILE, or None if there is none"""
+    try:
+        with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def load_published_hash():
+    """Content hash of the current OUTPUT_FILE, or None if there is none"""
+    published = load_published()
+    if published is None:
+        return None
+    return published.get('content_hash') or content_hash(published)
+
+def finalize_results(results):
+    """Date the reviews against what is already published and stamp the content hash"""
+    dated = date_reviews(results, load_published())
+    results['content_hash'] = content_hash(results)
+    print(f"    Dated {dated}/{len(results['reviews'])} reviews, content hash {results['content_hash'][:10]}")
+    return results
+
+def publish_if_changed(results):
+    """Write outputs only when the content differs from what is already published"""
+    new_hash = content_hash(results)
+    if new_hash == load_published_hash():
+        print("    No changes since last publish, keeping existing files")
+        return False
+    results['content_hash'] = new_hash
+    write_outputs(results)
+    print(f"    Published {len(results['reviews'])} reviews to {OUTPUT_FILE}")
+    return True
+
+async def scroll_reviews_feed(page, scroll_container, num_scrolls=5, enough=None):
+    """Scroll the reviews feed to load more reviews, stopping early once enough() is true"""
     for i in range(num_scrolls):
+        if enough and enough():
+            print(f"  Enough reviews loaded after {i} scroll(s)")
+            break
         try:
             await page.evaluate(f'''
                 const feed = document.querySelector('{scroll_container}');
@@ -34,7 +603,7 @@ async def scroll_reviews_feed(page, scroll_container, num_scrolls=5):
             print(f"  Scroll error: {e}")
             break
 
-async def extract_reviews(page):
+async def extract_reviews(page, health, stream=None):
     """Extract review data from the page"""
     reviews = []
     
@@ -47,17 +616,19 @@ async def extract_reviews(page):
     ]
     
     review_elements = []
-    for selector in review_selectors:
+    for selector in health.ordered('review_container', review_selectors):
         try:
             elements = await page.query_selector_all(selector)
-            if elements and len(elements) > 0:
-                review_elements = elements
-                print(f"  Found {len(elements)} reviews using selector: {selector}")
-                break
-        except:
+        except Exception:
             continue
+        if elements:
+            review_elements = elements
+            health.record_hit('review_container', selector)
+            print(f"  Found {len(elements)} reviews using selector: {selector}")
+            break
     
     if not review_elements:
+        health.record_miss('review_container', review_selectors)
         print("  No reviews found with standard selectors, trying alternative approach...")
         # Try to find any review-like containers
         review_elements = await page.query_selector_all('[class*="review"], [class*="Review"]')
@@ -66,75 +637,22 @@ async def extract_reviews(page):
         try:
             review_data = {}
             
-            # Extract reviewer name
-            name_selectors = ['.d4r55', '.WNxzHc', '[class*="name"]', '.Vpc5Fe']
-            for sel in name_selectors:
-                try:
-                    name_el = await review_el.query_selector(sel)
-                    if name_el:
-                        review_data['name'] = await name_el.inner_text()
-                        break
-                except:
-                    continue
-            
-            # Extract star rating
-            rating_selectors = ['.kvMYJc', '[aria-label*="star"]', '.DU9Pgb', '.fzvQIb']
-            for sel in rating_selectors:
-                try:
-                    rating_el = await review_el.query_selector(sel)
-                    if rating_el:
-                        aria_label = await rating_el.get_attribute('aria-label')
-                        if aria_label:
-                            # Extract number from "5 stars" or similar
-                            match = re.search(r'(\d+)', aria_label)
-                            if match:
-                                review_data['rating'] = int(match.group(1))
-                                break
-                        # Try counting filled stars
-                        stars = await rating_el.query_selector_all('.hCCjke, .vzX5Ic, [class*="star"]')
-                        if stars:
-                            review_data['rating'] = len(stars)
-                            break
-                except:
-                    continue
-            
-            # Extract review text
-            text_selectors = ['.wiI7pd', '.MyEned', '.Jtu6Td', '[class*="text"]', '.review-text']
-            for sel in text_selectors:
-                try:
-                    text_el = await review_el.query_selector(sel)
-                    if text_el:
-                        review_data['text'] = await text_el.inner_text()
-                        break
-                except:
-                    continue
-            
-            # Extract date
-            date_selectors = ['.rsqaWe', '.DU9Pgb', '[class*="date"]', '.dehysf']
-            for sel in date_selectors:
-                try:
-                    date_el = await review_el.query_selector(sel)
-                    if date_el:
-                        review_data['date'] = await date_el.inner_text()
-                        break
-                except:
-                    continue
-            
-            # Extract reviewer photo
-            photo_selectors = ['.NBa7we', 'img[class*="photo"]', '.lDY1rd img']
-            for sel in photo_selectors:
-                try:
-                    photo_el = await review_el.query_selector(sel)
-                    if photo_el:
-                        photo_src = await photo_el.get_attribute('src')
-                        if photo_src and not photo_src.startswith('data:'):
-                            review_data['reviewer_photo'] = photo_src
-                            break
-                except:
-                    continue
+            fields = [
+                ('name', REVIEW_FIELD_SELECTORS['name'], read_text),
+                ('rating', REVIEW_FIELD_SELECTORS['rating'], read_star_rating),
+                ('text', REVIEW_FIELD_SELECTORS['text'], read_text),
+                ('date', REVIEW_FIELD_SELECTORS['date'], read_text),
+                ('reviewer_photo', REVIEW_FIELD_SELECTORS['reviewer_photo'], read_photo_src),
+            ]
+            for field, candidates, extract in fields:
+                value = await query_field(review_el, f'review_{field}', candidates, health, extract,
+                                          report=field in REQUIRED_REVIEW_FIELDS)
+                if value is not None:
+                    review_data[field] = value
             
             if review_data.get('name') or review_data.get('text'):
                 reviews.append(review_data)
+                stream_record(stream, 'review', review_data)
                 print(f"  Extracted review {i+1}: {review_data.get('name', 'Unknown')}")
         
         except Exception as e:
@@ -143,10 +661,23 @@ async def extract_reviews(page):
     
     return reviews
 
-async def extract_photos(page):
+async def scroll_photo_gallery(page, max_scrolls=PHOTO_SCROLLS):
+    """Scroll the photo gallery until no new images load"""
+    previous_count = -1
+    for i in range(max_scrolls):
+        try:
+            count = await page.evaluate(PHOTO_SCROLL_JS, PHOTO_SCROLL_SELECTORS)
+        except Exception as e:
+            print(f"  Photo scroll error: {e}")
+            break
+        if count == previous_count:
+            break
+        previous_count = count
+        await page.wait_for_timeout(SCROLL_PAUSE_TIME)
+        print(f"  Photo scroll {i+1}/{max_scrolls}: {count} images loaded")
+
+async def extract_photos(page, health):
     """Extract business photos from the page"""
-    photos = []
-    
     # Try to click on Photos tab first
     photo_tab_selectors = [
         'button[aria-label*="Photo"]',
@@ -155,241 +686,328 @@ async def extract_photos(page):
         '.RWPxGd[aria-label*="photo"]'
     ]
     
-    for selector in photo_tab_selectors:
-        try:
-            photo_tab = await page.query_selector(selector)
-            if photo_tab:
-                await photo_tab.click()
-                await page.wait_for_timeout(2000)
-                print("  Clicked Photos tab")
-                break
-        except:
-            continue
+    if await click_field(page, 'photos_tab', photo_tab_selectors, health):
+        print("  Clicked Photos tab")
     
-    # Extract photo URLs
-    photo_selectors = [
-        '.U39Pmb',  # Photo thumbnails
-        '.Uf0tqf img',
-        '[class*="gallery"] img',
-        '.m6QErb img',
-        'img[src*="googleusercontent"]'
-    ]
-    
-    for selector in photo_selectors:
-        try:
-            photo_elements = await page.query_selector_all(selector)
-            for photo_el in photo_elements[:20]:  # Limit to 20 photos
-                try:
-                    # Get src or data-src
-                    src = await photo_el.get_attribute('src')
-                    if not src:
-                        src = await photo_el.get_attribute('data-src')
-                    
-                    if src and 'googleusercontent' in src and src not in photos:
-                        # Get higher resolution version
-                        high_res = re.sub(r'=w\d+-h\d+', '=w800-h600', src)
-                        high_res = re.sub(r'=s\d+', '=s800', high_res)
-                        photos.append(high_res)
-                except:
-                    continue
-            
-            if photos:
-                print(f"  Found {len(photos)} photos using selector: {selector}")
-                break
-        except:
-            continue
+    # Load more than the first screenful of thumbnails
+    await scroll_photo_gallery(page)
     
-    # Also try to get photos from the main page/overview
+    # Collect, normalize and dedupe every candidate URL in a single evaluate call
     try:
-        main_photos = await page.query_selector_all('img[src*="lh5.googleusercontent"], img[src*="lh3.googleusercontent"]')
-        for photo_el in main_photos:
-            src = await photo_el.get_attribute('src')
-            if src and src not in photos:
-                high_res = re.sub(r'=w\d+-h\d+', '=w800-h600', src)
-                photos.append(high_res)
-    except:
-        pass
+        photos = await page.evaluate(PHOTO_EXTRACT_JS, PHOTO_SELECTORS)
+    except Exception as e:
+        print(f"  Photo extraction error: {e}")
+        return []
     
-    return list(set(photos))  # Remove duplicates
+    photos = list(dict.fromkeys(photos))[:MAX_PHOTOS]
+    print(f"  Found {len(photos)} photos")
+    return photos
 
-async def scrape_google_reviews():
-    """Main scraping function"""
-    print("="*60)
-    print("GOOGLE MAPS REVIEWS SCRAPER")
-    print("="*60)
+async def launch_browser(p, low_memory=False):
+    """Launch the headless Chromium used for scraping"""
+    return await p.chromium.launch(
+        headless=True,
+        args=[
+            '--no-sandbox', 
+            '--disable-setuid-sandbox',
+            '--disable-blink-features=AutomationControlled',
+            '--disable-dev-shm-usage'
+        ] + (LOW_MEMORY_BROWSER_ARGS if low_memory else [])
+    )
+
+async def route_fixture(context, fixture_dir, record):
+    """Record every response into the fixture HAR, or serve the run from it with no network.
     
+    Requests missing from the HAR are aborted during replay, so nothing reaches Google.
+    """
+    har_path = os.path.join(fixture_dir, FIXTURE_HAR)
+    if record:
+        os.makedirs(fixture_dir, exist_ok=True)
+        await context.route_from_har(har_path, update=True, update_content='embed')
+        print(f"    Recording fixture to {har_path}")
+    else:
+        if not os.path.exists(har_path):
+            raise FileNotFoundError(f"No recorded fixture at {har_path} (record one with --record)")
+        await context.route_from_har(har_path, not_found='abort')
+        print(f"    Replaying {har_path} (network disabled)")
+
+async def save_dom_snapshot(page, fixture_dir):
+    """Save the rendered page and where it came from next to the HAR"""
+    with open(os.path.join(fixture_dir, FIXTURE_DOM), 'w', encoding='utf-8') as f:
+        f.write(await page.content())
+    write_json_atomic(os.path.join(fixture_dir, FIXTURE_INFO), {
+        'url': GOOGLE_MAPS_URL,
+        'page_url': page.url,
+        'recorded_at': datetime.now().isoformat()
+    }, indent=2)
+    print(f"    DOM snapshot saved to {os.path.join(fixture_dir, FIXTURE_DOM)}")
+
+async def scrape_with_browser(browser, trace_path=None, metrics=None, record_dir=None, replay_dir=None,
+                              parse_responses=True, low_memory=False):
+    """Run one scrape in a fresh context on a running browser.
+    
+    Returns (results, error) where error is None, 'timeout', 'consent', 'empty' or 'error'.
+    With record_dir the run is saved as an offline fixture; with replay_dir it is served
+    from one, and the stream goes to the fixture dir and selector health is left untouched.
+    With parse_responses reviews come from the review XHR payloads, falling back to the DOM.
+    low_memory uses a small viewport, skips media and fonts, screenshots only failed runs
+    and closes the page and CDP session before the context.
+    """
     results = {
         "business_name": "",
         "rating": "",
         "total_reviews": "",
         "reviews": [],
         "photos": [],
-        "scraped_at": datetime.now().isoformat()
+        "scraped_at": datetime.now(REVIEW_TIMEZONE).isoformat(timespec='seconds')
     }
+    stream_file = os.path.join(replay_dir, REPLAY_STREAM_FILE) if replay_dir else STREAM_FILE
+    stream = open_stream(results['scraped_at'], stream_file)
+    metrics = metrics or ScrapeMetrics()
+    health = SelectorHealth()
+    error = None
     
-    async with async_playwright() as p:
-        print("\n[1] Launching browser...")
-        browser = await p.chromium.launch(
-            headless=True,
-            args=[
-                '--no-sandbox', 
-                '--disable-setuid-sandbox',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-dev-shm-usage'
-            ]
-        )
-        
+    context = raw_page = page = cdp = None
+    
+    try:
+        metrics.start_phase('context')
         context = await browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
+            viewport=LOW_MEMORY_VIEWPORT if low_memory else {'width': 1920, 'height': 1080},
             user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             locale='en-US',
             timezone_id='Asia/Kolkata'
         )
         
-        page = await context.new_page()
+        if low_memory:
+            await context.route('**/*', lambda route: route.abort()
+                                if route.request.resource_type in LOW_MEMORY_BLOCKED_RESOURCES
+                                else route.fallback())
+        
+        if record_dir or replay_dir:
+            await route_fixture(context, record_dir or replay_dir, record=bool(record_dir))
+        
+        if trace_path:
+            await context.tracing.start(screenshots=True, snapshots=True)
+        
+        raw_page = await context.new_page()
         
         # Apply stealth mode
         print("[2] Applying stealth mode...")
         stealth = Stealth()
-        await stealth.apply_stealth_async(page)
+        await stealth.apply_stealth_async(raw_page)
+        cdp = await metrics.attach(context, raw_page)
+        page = PlaywrightCallCounter(raw_page, metrics)
+        review_parser = ReviewResponseParser(MAX_REVIEWS) if parse_responses else None
+        if review_parser:
+            review_parser.attach(raw_page)
+        
+        print(f"[3] Navigating to: {GOOGLE_MAPS_URL}")
+        metrics.start_phase('navigation')
+        await page.goto(GOOGLE_MAPS_URL, wait_until='domcontentloaded', timeout=60000)
+        await page.wait_for_timeout(5000)
+        
+        # Handle Google consent popup if present
+        metrics.start_phase('consent')
+        consent_buttons = [
+            'button:has-text("Accept all")',
+            'button:has-text("Accept")',
+            '[aria-label="Accept all"]',
+            'form[action*="consent"] button'
+        ]
+        # The popup is only shown in some regions, so a miss is not breakage
+        if await click_field(page, 'consent_button', consent_buttons, health, report=False):
+            print("    Accepted consent popup")
+        
+        # Check if we got redirected
+        current_url = page.url
+        print(f"    Current URL: {current_url}")
+        if 'consent.google' in current_url:
+            raise ConsentWallError(current_url)
+        
+        # Click on the first result if on search page
+        metrics.start_phase('place')
+        first_result_selectors = [
+            '.Nv2PK',  # Business result card
+            'a[href*="place"]',
+            '.hfpxzc'
+        ]
+        # Direct place redirects skip the result list, so a miss is not breakage
+        if await click_field(page, 'first_result', first_result_selectors, health,
+                             wait_ms=3000, report=False):
+            print("    Clicked on first result")
+        
+        # Wait for page to fully load
+        await page.wait_for_timeout(2000)
+        
+        # Extract business name
+        name_selectors = ['.DUwDvf', '.qBF1Pd', 'h1', '[data-attrid="title"]']
+        business_name = await query_field(page, 'business_name', name_selectors, health, read_text)
+        if business_name:
+            results['business_name'] = business_name
+            print(f"    Business: {results['business_name']}")
+        
+        # Extract overall rating
+        rating_selectors = ['.F7nice span', '.ceNzKf', '[class*="rating"]']
+        rating = await query_field(page, 'business_rating', rating_selectors, health, read_text)
+        if rating:
+            results['rating'] = rating
+            print(f"    Rating: {results['rating']}")
         
+        stream_record(stream, 'meta', {
+            'business_name': results['business_name'],
+            'rating': results['rating']
+        })
+        
+        # Try to click on Reviews tab
+        print("\n[4] Looking for Reviews tab...")
+        metrics.start_phase('reviews_tab')
+        reviews_tab_selectors = [
+            'button[aria-label*="Review"]',
+            '[data-tab-index="1"]',
+            'button:has-text("Reviews")',
+            '.RWPxGd[aria-label*="review"]',
+            '[role="tab"]:has-text("Reviews")'
+        ]
+        
+        if await click_field(page, 'reviews_tab', reviews_tab_selectors, health):
+            print(f"    Clicked Reviews tab")
+        
+        # Scroll to load more reviews
+        print("\n[5] Scrolling to load reviews...")
+        metrics.start_phase('scrolling')
+        scroll_selectors = [
+            'div[role="feed"]',
+            '.m6QErb.DxyBCb',
+            '.m6QErb[aria-label]',
+            '.section-layout'
+        ]
+        
+        for scroll_sel in health.ordered('reviews_feed', scroll_selectors):
+            try:
+                scroll_el = await page.query_selector(scroll_sel)
+            except Exception:
+                continue
+            if scroll_el:
+                health.record_hit('reviews_feed', scroll_sel)
+                await scroll_reviews_feed(page, scroll_sel, num_scrolls=5,
+                                          enough=review_parser and review_parser.has_enough)
+                break
+        else:
+            health.record_miss('reviews_feed', scroll_selectors)
+        
+        if record_dir:
+            await save_dom_snapshot(raw_page, record_dir)
+        
+        # Extract reviews
+        print("\n[6] Extracting reviews...")
+        metrics.start_phase('extraction')
+        if review_parser and review_parser.reviews:
+            results['reviews'] = review_parser.reviews[:MAX_REVIEWS]
+            for review in results['reviews']:
+                stream_record(stream, 'review', review)
+            print(f"    Parsed from {review_parser.responses} review response(s)")
+        else:
+            if review_parser:
+                print(f"    No parsable review responses ({review_parser.responses} seen), reading the page instead")
+            results['reviews'] = await extract_reviews(page, health, stream)
+        print(f"    Total reviews extracted: {len(results['reviews'])}")
+        
+        # Extract photos
+        print("\n[7] Extracting photos...")
+        metrics.start_phase('photos')
+        results['photos'] = await extract_photos(page, health)
+        for url in results['photos']:
+            stream_record(stream, 'photo', {'url': url})
+        print(f"    Total photos extracted: {len(results['photos'])}")
+        
+        metrics.end_phase()
+        await metrics.sample_memory(cdp)
+        
+    except PlaywrightTimeout as e:
+        error = 'timeout'
+        print(f"ERROR: Page load timeout - {e}")
+    except ConsentWallError as e:
+        error = 'consent'
+        print(f"ERROR: Stuck on consent wall - {e}")
+    except Exception as e:
+        error = 'error'
+        print(f"ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        # Take a screenshot for debugging (low-memory runs only keep one when something went wrong)
+        if page is not None and (not low_memory or error or not results['reviews']):
+            try:
+                await page.screenshot(path=DEBUG_SCREENSHOT)
+                print(f"\n    Debug screenshot saved to {DEBUG_SCREENSHOT}")
+            except Exception as e:
+                print(f"    Debug screenshot not saved: {e}")
+        if trace_path and context is not None:
+            try:
+                await context.tracing.stop(path=trace_path)
+                print(f"    Trace saved to {trace_path}")
+            except Exception as e:
+                print(f"    Trace not saved: {e}")
+        if low_memory:
+            metrics.sample_rss()
+            try:
+                if cdp is not None:
+                    await cdp.detach()
+                if raw_page is not None:
+                    await raw_page.close()
+            except Exception as e:
+                print(f"    Page not closed cleanly: {e}")
+        if context is not None:
+            await context.close()
+        if not replay_dir:
+            health.save()
+        run_metrics = metrics.as_dict()
+        run_metrics['broken_selectors'] = health.broken_fields()
+        stream_record(stream, 'metrics', run_metrics)
+        stream_record(stream, 'end', {'error': error})
+        stream.close()
+
+    results = finalize_results(compact_stream(stream_file) or results)
+    if error is None and not results['reviews']:
+        error = 'empty'
+    
+    metrics.print_summary()
+    health.print_report()
+    return results, error
+
+async def scrape_google_reviews(trace_path=None, record_dir=None, replay_dir=None, parse_responses=True,
+                                low_memory=False):
+    """Main scraping function"""
+    print("="*60)
+    print("GOOGLE MAPS REVIEWS SCRAPER")
+    print("="*60)
+    
+    metrics = ScrapeMetrics()
+    async with async_playwright() as p:
+        print("\n[1] Launching browser...")
+        metrics.start_phase('launch')
+        browser = await launch_browser(p, low_memory)
         try:
-            print(f"[3] Navigating to: {GOOGLE_MAPS_URL}")
-            await page.goto(GOOGLE_MAPS_URL, wait_until='domcontentloaded', timeout=60000)
-            await page.wait_for_timeout(5000)
-            
-            # Handle Google consent popup if present
-            consent_buttons = [
-                'button:has-text("Accept all")',
-                'button:has-text("Accept")',
-                '[aria-label="Accept all"]',
-                'form[action*="consent"] button'
-            ]
-            for btn_sel in consent_buttons:
-                try:
-                    btn = await page.query_selector(btn_sel)
-                    if btn:
-                        await btn.click()
-                        print("    Accepted consent popup")
-                        await page.wait_for_timeout(2000)
-                        break
-                except:
-                    continue
-            
-            # Check if we got redirected
-            current_url = page.url
-            print(f"    Current URL: {current_url}")
-            
-            # Click on the first result if on search page
-            first_result_selectors = [
-                '.Nv2PK',  # Business result card
-                'a[href*="place"]',
-                '.hfpxzc'
-            ]
-            for sel in first_result_selectors:
-                try:
-                    result = await page.query_selector(sel)
-                    if result:
-                        await result.click()
-                        print("    Clicked on first result")
-                        await page.wait_for_timeout(3000)
-                        break
-                except:
-                    continue
-            
-            # Wait for page to fully load
-            await page.wait_for_timeout(2000)
-            
-            # Extract business name
-            name_selectors = ['.DUwDvf', '.qBF1Pd', 'h1', '[data-attrid="title"]']
-            for sel in name_selectors:
-                try:
-                    name_el = await page.query_selector(sel)
-                    if name_el:
-                        results['business_name'] = await name_el.inner_text()
-                        print(f"    Business: {results['business_name']}")
-                        break
-                except:
-                    continue
-            
-            # Extract overall rating
-            rating_selectors = ['.F7nice span', '.ceNzKf', '[class*="rating"]']
-            for sel in rating_selectors:
-                try:
-                    rating_el = await page.query_selector(sel)
-                    if rating_el:
-                        results['rating'] = await rating_el.inner_text()
-                        print(f"    Rating: {results['rating']}")
-                        break
-                except:
-                    continue
-            
-            # Try to click on Reviews tab
-            print("\n[4] Looking for Reviews tab...")
-            reviews_tab_selectors = [
-                'button[aria-label*="Review"]',
-                '[data-tab-index="1"]',
-                'button:has-text("Reviews")',
-                '.RWPxGd[aria-label*="review"]',
-                '[role="tab"]:has-text("Reviews")'
-            ]
-            
-            for selector in reviews_tab_selectors:
-                try:
-                    tab = await page.query_selector(selector)
-                    if tab:
-                        await tab.click()
-                        await page.wait_for_timeout(2000)
-                        print(f"    Clicked Reviews tab")
-                        break
-                except Exception as e:
-                    continue
-            
-            # Scroll to load more reviews
-            print("\n[5] Scrolling to load reviews...")
-            scroll_selectors = [
-                'div[role="feed"]',
-                '.m6QErb.DxyBCb',
-                '.m6QErb[aria-label]',
-                '.section-layout'
-            ]
-            
-            for scroll_sel in scroll_selectors:
-                try:
-                    scroll_el = await page.query_selector(scroll_sel)
-                    if scroll_el:
-                        await scroll_reviews_feed(page, scroll_sel, num_scrolls=5)
-                        break
-                except:
-                    continue
-            
-            # Extract reviews
-            print("\n[6] Extracting reviews...")
-            results['reviews'] = await extract_reviews(page)
-            print(f"    Total reviews extracted: {len(results['reviews'])}")
-            
-            # Extract photos
-            print("\n[7] Extracting photos...")
-            results['photos'] = await extract_photos(page)
-            print(f"    Total photos extracted: {len(results['photos'])}")
-            
-            # Take a screenshot for debugging
-            await page.screenshot(path='debug_screenshot.png')
-            print("\n    Debug screenshot saved to debug_screenshot.png")
-            
-        except PlaywrightTimeout as e:
-            print(f"ERROR: Page load timeout - {e}")
-        except Exception as e:
-            print(f"ERROR: {e}")
-            import traceback
-            traceback.print_exc()
+            results, error = await scrape_with_browser(browser, trace_path, metrics, record_dir, replay_dir,
+                                                       parse_responses, low_memory)
         finally:
             await browser.close()
     
-    # Save results to JSON
-    print(f"\n[8] Saving results to {OUTPUT_FILE}...")
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    if replay_dir:
+        print(f"\n[8] Replay only: {OUTPUT_FILE} left untouched, run kept in "
+              f"{os.path.join(replay_dir, REPLAY_STREAM_FILE)}")
+        print(f"Business: {results['business_name']}")
+        print(f"Reviews: {len(results['reviews'])}")
+        print(f"Photos: {len(results['photos'])}")
+        return results
+    
+    # Save results to JSON (rebuilt from the stream so a crash mid-run is recoverable)
+    if error:
+        print(f"\n[8] Run failed ({error}); keeping existing {OUTPUT_FILE} and {SITE_OUTPUT_FILE}")
+    else:
+        print(f"\n[8] Publishing to {OUTPUT_FILE} and {SITE_OUTPUT_FILE} if the reviews changed...")
+        publish_if_changed(results)
+        rotate_stream()
     
     print("\n" + "="*60)
     print("SCRAPING COMPLETE")
@@ -400,5 +1018,114 @@ async def scrape_google_reviews():
     
     return results
 
+def next_delay(failures, interval_seconds, jitter=DAEMON_JITTER):
+    """Seconds until the next run: the interval on success, exponential backoff on failure"""
+    if failures:
+        delay = min(BACKOFF_BASE_SECONDS * 2 ** (failures - 1), BACKOFF_MAX_SECONDS)
+    else:
+        delay = interval_seconds
+    return delay * random.uniform(1 - jitter, 1 + jitter)
+
+async def run_daemon(interval_minutes=DAEMON_INTERVAL_MINUTES, trace_path=None, parse_responses=True,
+                     low_memory=False):
+    """Keep one browser warm and re-scrape on a jittered schedule.
+    
+    With low_memory the browser is closed after every run instead, so nothing stays resident between runs.
+    """
+    print("="*60)
+    print(f"GOOGLE MAPS REVIEWS SCRAPER - DAEMON (every ~{interval_minutes} min)")
+    print("="*60)
+    
+    failures = 0
+    async with async_playwright() as p:
+        browser = None
+        try:
+            while True:
+                if browser is None or not browser.is_connected():
+                    print("\n[1] Launching browser...")
+                    browser = await launch_browser(p, low_memory)
+                
+                print(f"\n--- Run at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ---")
+                try:
+                    results, error = await scrape_with_browser(browser, trace_path,
+                                                               parse_responses=parse_responses,
+                                                               low_memory=low_memory)
+                except Exception as e:
+                    results, error = None, 'error'
+                    print(f"ERROR: {e}")
+                
+                if low_memory:
+                    await browser.close()
+                    browser = None
+                
+                if error:
+                    failures += 1
+                    print(f"    Run failed ({error}), attempt {failures}; keeping existing files")
+                else:
+                    failures = 0
+                    publish_if_changed(results)
+                    rotate_stream()
+                
+                delay = next_delay(failures, interval_minutes * 60)
+                print(f"    Next run in {delay / 60:.1f} min")
+                await asyncio.sleep(delay)
+        finally:
+            if browser is not None:
+                await browser.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Google Maps reviews and photos")
+    parser.add_argument('--compact-only', action='store_true',
+                        help=f"Rebuild {OUTPUT_FILE} from {STREAM_FILE} (or {ROTATED_STREAM_FILE} "
+                             f"after a publish) without scraping")
+    parser.add_argument('--trace', nargs='?', const=TRACE_FILE, default=None, metavar='PATH',
+                        help=f"Record a Playwright trace (default: {TRACE_FILE})")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Keep running and re-scrape on a schedule, publishing only changes")
+    parser.add_argument('--interval', type=float, default=DAEMON_INTERVAL_MINUTES, metavar='MINUTES',
+                        help=f"Minutes between daemon runs (default: {DAEMON_INTERVAL_MINUTES})")
+    parser.add_argument('--dom-reviews', action='store_true',
+                        help="Read reviews from the rendered page instead of the review network responses")
+    parser.add_argument('--low-memory', action='store_true',
+                        help="Small viewport, lean Chromium flags and screenshots only on failure")
+    fixture = parser.add_mutually_exclusive_group()
+    fixture.add_argument('--record', nargs='?', const=FIXTURE_DIR, default=None, metavar='DIR',
+                         help=f"Save this run as an offline HAR/DOM fixture (default: {FIXTURE_DIR})")
+    fixture.add_argument('--replay', nargs='?', const=FIXTURE_DIR, default=None, metavar='DIR',
+                         help=f"Scrape a recorded fixture with the network disabled (default: {FIXTURE_DIR})")
+    args = parser.parse_args()
+    if args.daemon and (args.record or args.replay):
+        parser.error("--record and --replay run a single scrape and cannot be used with --daemon")
+    
+    if args.compact_only:
+        for stream_file in (STREAM_FILE, ROTATED_STREAM_FILE):
+            results = compact_stream(stream_file)
+            if results is not None:
+                break
+        if results is None:
+            print(f"No runs found in {STREAM_FILE}")
+            return
+        # Same guard as a scrape: a crashed, partial or empty run never replaces published files
+        error = stream_run_error(stream_file)
+        if error is None and not results['reviews']:
+            error = 'empty'
+        if error:
+            print(f"Last run in {stream_file} did not finish cleanly ({error}), keeping existing {OUTPUT_FILE}")
+            return
+        print(f"Compacted {len(results['reviews'])} reviews and {len(results['photos'])} photos from {stream_file}")
+        publish_if_changed(finalize_results(results))
+        return
+    
+    if args.daemon:
+        try:
+            asyncio.run(run_daemon(args.interval, trace_path=args.trace, parse_responses=not args.dom_reviews,
+                                   low_memory=args.low_memory))
+        except KeyboardInterrupt:
+            print("\nDaemon stopped")
+        return
+    
+    asyncio.run(scrape_google_reviews(trace_path=args.trace, record_dir=args.record, replay_dir=args.replay,
+                                      parse_responses=not args.dom_reviews, low_memory=args.low_memory))
+
 if __name__ == "__main__":
-    asyncio.run(scrape_google_reviews())
+    main()
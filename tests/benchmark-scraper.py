@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Google reviews scraper extraction benchmark and replay check on a saved fixture (no network).
+
+Loads tests/fixtures/google-maps/reviews.html into headless Chromium with
+every request aborted, then times extract_reviews and the photo URL
+collection and counts the awaited Playwright calls each one makes (the
+same count the scraper's metrics report). Then replays session.har through the
+whole scrape with `--replay`, which serves it via route_from_har with
+unmatched requests aborted. The committed fixture is synthetic;
+`scrape_google_reviews.py --record` replaces it with a recording of the
+live page.
+
+Usage:
+    python3 tests/benchmark-scraper.py                  # committed fixture, 10 runs
+    python3 tests/benchmark-scraper.py --fixture DIR    # a fixture saved with --record DIR
+    python3 tests/benchmark-scraper.py --runs 50 --skip-replay
+
+Exits 1 when the DOM fixture or the replay yields no reviews, so selector
+changes that break extraction fail here before they reach Google.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+DEFAULT_RUNS = 10
+
+
+def load_scraper():
+    """Import scrape_google_reviews.py from the project root."""
+    sys.path.insert(0, PROJECT_ROOT)
+    import scrape_google_reviews
+    return scrape_google_reviews
+
+
+async def run_benchmark(scraper, html, runs):
+    """Extract from the fixture `runs` times; returns (per-run phase metrics, reviews, photos, broken fields)."""
+    samples = []
+    async with scraper.async_playwright() as p:
+        browser = await scraper.launch_browser(p)
+        try:
+            context = await browser.new_context(viewport={'width': 1920, 'height': 1080})
+            await context.route('**/*', lambda route: route.abort())
+            page = await context.new_page()
+            await page.set_content(html, wait_until='domcontentloaded')
+            # One health record for every run: the first run tries selectors cold, later runs warm
+            health = scraper.SelectorHealth(os.devnull)
+            for _ in range(runs):
+                metrics = scraper.ScrapeMetrics()
+                counted = scraper.PlaywrightCallCounter(page, metrics)
+                with contextlib.redirect_stdout(io.StringIO()):  # The scraper logs every review
+                    metrics.start_phase('extraction')
+                    reviews = await scraper.extract_reviews(counted, health)
+                    metrics.start_phase('photos')
+                    photos = await counted.evaluate(scraper.PHOTO_EXTRACT_JS, scraper.PHOTO_SELECTORS)
+                    metrics.end_phase()
+                samples.append(metrics.phases)
+        finally:
+            await browser.close()
+    return samples, reviews, photos, health.broken_fields()
+
+
+async def run_replay(scraper, fixture_dir):
+    """One full scrape served from the fixture HAR; returns (results, error, metrics)."""
+    metrics = scraper.ScrapeMetrics()
+    async with scraper.async_playwright() as p:
+        browser = await scraper.launch_browser(p)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                results, error = await scraper.scrape_with_browser(browser, metrics=metrics, replay_dir=fixture_dir)
+        finally:
+            await browser.close()
+    return results, error, metrics.as_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixture', default=None, metavar='DIR',
+                        help="fixture directory (default: tests/fixtures/google-maps)")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS,
+                        help="extraction runs on the loaded page (default: %(default)s)")
+    parser.add_argument('--skip-replay', action='store_true',
+                        help="only benchmark extraction, without the full HAR replay")
+    args = parser.parse_args()
+
+    try:
+        scraper = load_scraper()
+    except ImportError as e:
+        print(f"⚠️ Scraper dependencies not installed ({e}); pip install playwright playwright-stealth")
+        return 0
+
+    fixture_dir = args.fixture or os.path.join(PROJECT_ROOT, scraper.FIXTURE_DIR)
+    dom_file = os.path.join(fixture_dir, scraper.FIXTURE_DOM)
+    try:
+        with open(dom_file, 'r', encoding='utf-8') as f:
+            html = f.read()
+    except FileNotFoundError:
+        print(f"❌ No DOM snapshot at {dom_file} (record one with scrape_google_reviews.py --record)")
+        return 1
+
+    print(f"📄 {os.path.relpath(dom_file, PROJECT_ROOT)} ({len(html) / 1024:.0f} KB), {args.runs} runs")
+    samples, reviews, photos, broken = asyncio.run(run_benchmark(scraper, html, max(args.runs, 1)))
+
+    for phase in ('extraction', 'photos'):
+        seconds = [sample[phase]['seconds'] for sample in samples]
+        calls = [sample[phase]['playwright_calls'] for sample in samples]
+        warm = seconds[1:] or seconds
+        print(f"  {phase:<12} cold {seconds[0] * 1000:8.1f} ms  warm median {statistics.median(warm) * 1000:8.1f} ms  "
+              f"Playwright calls cold {calls[0]:4}  warm {calls[-1]:4}")
+    print(f"  Extracted {len(reviews)} reviews and {len(photos)} photo URLs")
+
+    if broken:
+        print(f"⚠️ Selectors broken on this fixture: {', '.join(broken)}")
+    if not reviews:
+        print("❌ No reviews extracted from the fixture")
+        return 1
+    print("✅ Extraction works offline")
+    if args.skip_replay:
+        return 0
+
+    har_file = os.path.join(fixture_dir, scraper.FIXTURE_HAR)
+    if not os.path.exists(har_file):
+        print(f"❌ No HAR at {har_file} (record one with scrape_google_reviews.py --record)")
+        return 1
+    print(f"\n🔁 Replaying {os.path.relpath(har_file, PROJECT_ROOT)} with the network disabled")
+    results, error, metrics = asyncio.run(run_replay(scraper, fixture_dir))
+    for name, phase in metrics['phases'].items():
+        print(f"  {name:<12} {phase['seconds'] * 1000:8.1f} ms  Playwright calls {phase['playwright_calls']:4}")
+    print(f"  Replayed {len(results['reviews'])} reviews and {len(results['photos'])} photo URLs")
+    if error:
+        print(f"❌ Replay failed ({error})")
+        return 1
+    print("✅ Replay works offline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Trip Manager data-layer benchmarks on synthetic catalogs (stdlib timeit only).
+
+Times load_trips (cold and incremental), js_to_json, generate_js_content,
+update_cache_version and the trip list search (display_trips' filter and
+the catalog FTS query behind it) for 50, 500 and 5000 trips, and compares
+the results with tests/benchmark-baseline.json.
+
+Usage:
+    python3 tests/benchmark-trip-manager.py                     # compare, exit 1 on regression
+    python3 tests/benchmark-trip-manager.py --update-baseline   # record new numbers
+    python3 tests/benchmark-trip-manager.py --sizes 50,500      # quicker run
+
+Timings are stored relative to a fixed pure-Python calibration loop, so a
+baseline recorded on one machine is still meaningful on another. The whole
+suite runs in rounds, each calibrated on its own, and every benchmark
+reports its median across rounds; baselines are recorded over more rounds
+than a comparison run.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import timeit
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+TRIP_MANAGER = os.path.join(PROJECT_ROOT, "admin", "trip-manager.py")
+BASELINE_FILE = os.path.join(TESTS_DIR, "benchmark-baseline.json")
+
+DEFAULT_SIZES = (50, 500, 5000)
+DEFAULT_TOLERANCE = 3.0  # Fail when a benchmark gets this many times slower
+DEFAULT_ROUNDS = 3
+BASELINE_ROUNDS = 5
+MIN_COMPARABLE_UNITS = 0.05  # Faster than this is mostly timer noise; never flagged
+REPEATS = 5
+
+PLACES = ['Coorg', 'Chikmagalur', 'Gokarna', 'Hampi', 'Wayanad', 'Munnar', 'Ooty', 'Kodachadri',
+          'Kudremukh', 'Dandeli', 'Varkala', 'Pondicherry', 'Yercaud', 'Sakleshpur', 'Spiti']
+KINDS = ['Trek', 'Backpacking', 'Beach Camping', 'Waterfall Trail', 'Sunrise Hike', 'Heritage Walk']
+EMOJI = ['🌄', '🌅', '🌊', '🌙', '🏕️', '🔥', '🌿', '⛰️', '🚌', '🍛']
+ACTIVITIES = ['Pickup from Bangalore', 'Breakfast at a local eatery', 'Start the trek from base village',
+              'Reach the summit and enjoy the views', 'Lunch by the river', 'Campfire and music',
+              'Explore the waterfall', 'Sunset at the viewpoint', 'Check in to the homestay',
+              "Visit the temple (don't miss the carvings)", 'Drop back to Bangalore by 10 PM']
+DIFFICULTIES = ['Easy', 'Easy-Moderate', 'Moderate', 'Moderate-Hard', 'Challenging']
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def load_trip_manager():
+    """Import admin/trip-manager.py (the hyphenated name rules out a plain import)."""
+    spec = importlib.util.spec_from_file_location('trip_manager', TRIP_MANAGER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_trips(count, seed=42):
+    """Realistic-looking trips: multi-day itineraries, emoji, quotes and dated batches."""
+    rng = random.Random(seed)
+    trips = []
+    for n in range(count):
+        place = rng.choice(PLACES)
+        days = rng.choice([1, 2, 2, 2, 3, 3, 4, 8])
+        title = f"{place} {rng.choice(KINDS)} {rng.choice(EMOJI)}"
+        itinerary = [{
+            'day': f"Day {d + 1}",
+            'title': f"{rng.choice(EMOJI)} {rng.choice(ACTIVITIES)}",
+            'activities': rng.sample(ACTIVITIES, rng.randint(3, 7)),
+        } for d in range(days)]
+        dates = []
+        for _ in range(rng.randint(2, 8)):
+            month, day = rng.randint(0, 11), rng.randint(1, 25)
+            dates.append(f"{MONTH_NAMES[month]} {day}-{day + days - 1}, 2026" if days > 1
+                         else f"{MONTH_NAMES[month]} {day}, 2026")
+        trips.append({
+            'id': f"{place.lower()}-{n}",
+            'title': title,
+            'location': f"{place}, Karnataka",
+            'badge': rng.choice(['Weekend Trip', 'Long Weekend Special', 'Day Trip', 'Adventure']),
+            'price': f"₹{rng.randint(12, 190) * 100 - 1:,}",
+            'duration': '1 Day' if days == 1 else f"{days}D/{days - 1}N",
+            'difficulty': rng.choice(DIFFICULTIES),
+            'groupSize': f"{rng.randint(10, 20)}-{rng.randint(25, 40)} people",
+            'image': f"images/trips/{place.lower()}.jpg",
+            'galleryImages': [f"images/trips/{place.lower()}-{i}.jpg" for i in range(rng.randint(0, 6))],
+            'about': ' '.join(rng.sample(ACTIVITIES, 5)) + f". A \"must-do\" {place} escape.\n\nBook early!",
+            'highlights': [f"{rng.choice(EMOJI)} {a}" for a in rng.sample(ACTIVITIES, 4)],
+            'itinerary': itinerary,
+            'availableDates': dates,
+            'inclusions': ['Transport', 'Breakfast', 'Trek guide'],
+            'exclusions': ['Personal expenses'],
+            'isActive': rng.random() > 0.1,
+            'featured': rng.random() > 0.9,
+        })
+    return trips
+
+
+def escape_astral(source):
+    """Write emoji as \\uD83C-style surrogate escapes, as the hand-edited trips-data.js does."""
+    def escape(match):
+        code = ord(match[0]) - 0x10000
+        return f"\\u{0xD800 + (code >> 10):04X}\\u{0xDC00 + (code & 0x3FF):04X}"
+    return re.sub(r'[\U00010000-\U0010FFFF]', escape, source)
+
+
+def calibrate():
+    """Seconds for a fixed pure-Python workload; timings are reported in these units."""
+    def workload():
+        total = 0
+        for i in range(200000):
+            total += i % 7
+        return total
+    return min(timeit.repeat(workload, number=1, repeat=REPEATS))
+
+
+def best_of(func, setup=None):
+    """Best wall time of REPEATS runs; `setup` runs untimed before each one."""
+    times = []
+    for _ in range(REPEATS):
+        if setup:
+            setup()
+        times.append(timeit.timeit(func, number=1))
+    return min(times)
+
+
+def run_size(tm, size, workdir):
+    """Time every benchmark for one catalog size; returns {name: seconds}."""
+    app = tm.TripManagerApp.__new__(tm.TripManagerApp)
+    app.parsed_blocks = {}
+    app.store = None
+    app.written_files = set()
+    app.trips = tm.TripCatalog(synthetic_trips(size))
+
+    data_file = os.path.join(workdir, f"trips-data-{size}.js")
+    source = escape_astral(app.generate_js_content())
+    with open(data_file, 'w', encoding='utf-8') as f:
+        f.write(source)
+    tm.TRIPS_DATA_FILE = data_file
+    js_object = re.search(r'const\s+tripsData\s*=\s*(\{[\s\S]*?\});', source).group(1)
+
+    html_files = [os.path.join(workdir, name) for name in ('index.html', 'trips.html', 'trip-detail.html', 'checkout.html')]
+    tm.HTML_FILES = html_files
+
+    def stale_html():
+        # An old version in every page, so each run rewrites all of them
+        for path in html_files:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('<html><body>' + '<p>filler</p>\n' * 2000 + '<script src="js/trips-data.js?v=1"></script></body></html>')
+
+    store = tm.TripStore(':memory:')
+    store.save(list(app.trips))
+
+    def cold_cache():
+        app.parsed_blocks = {}
+
+    results = {}
+    results['load_trips (cold)'] = best_of(app.load_trips, setup=cold_cache)
+    results['load_trips (incremental)'] = best_of(app.load_trips)
+    assert len(app.trips) == size, f"load_trips parsed {len(app.trips)} of {size} trips"
+    results['js_to_json'] = best_of(lambda: json.loads(app.js_to_json(js_object)))
+    results['generate_js_content'] = best_of(app.generate_js_content)
+    results['update_cache_version'] = best_of(app.update_cache_version, setup=stale_html)
+    app.store = store
+    results['search (trip list filter)'] = best_of(lambda: app.matching_trips('waterfall'))
+    results['search (catalog FTS)'] = best_of(lambda: store.search('waterfall sunrise', limit=-1))
+    store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated catalog sizes (default: %(default)s)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="slowdown factor that counts as a regression (default: %(default)s)")
+    parser.add_argument('--rounds', type=int, default=None,
+                        help=f"suite repetitions to take the median of (default: {DEFAULT_ROUNDS}, "
+                             f"{BASELINE_ROUNDS} with --update-baseline)")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help=f"write results to {os.path.relpath(BASELINE_FILE, PROJECT_ROOT)}")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    rounds = max(args.rounds or (BASELINE_ROUNDS if args.update_baseline else DEFAULT_ROUNDS), 1)
+
+    tm = load_trip_manager()
+
+    try:
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+    except FileNotFoundError:
+        baseline = {}
+
+    # {size: {name: ([seconds per round], [units per round])}}; each round is calibrated
+    # just before it runs, so a machine that slows down mid-run skews no single round
+    samples, units = {size: {} for size in sizes}, []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(rounds):
+            unit = calibrate()
+            units.append(unit)
+            for size in sizes:
+                with contextlib.redirect_stdout(io.StringIO()):  # The app logs every file it writes
+                    timings = run_size(tm, size, workdir)
+                for name, seconds in timings.items():
+                    seconds_list, unit_list = samples[size].setdefault(name, ([], []))
+                    seconds_list.append(seconds)
+                    unit_list.append(seconds / unit)
+    print(f"⏱️  Calibration loop: {statistics.median(units) * 1000:.1f} ms "
+          f"(timings below are in these units, median of {rounds} round(s))")
+
+    results, regressions = {}, []
+    for size in sizes:
+        print(f"\n📦 {size} trips")
+        for name, (seconds_list, unit_list) in samples[size].items():
+            key = f"{name} @ {size}"
+            results[key] = round(statistics.median(unit_list), 4)
+            previous = baseline.get(key)
+            verdict = ""
+            if previous:
+                ratio = results[key] / previous
+                verdict = f"  {ratio:5.2f}x baseline"
+                if ratio > args.tolerance and results[key] >= MIN_COMPARABLE_UNITS:
+                    verdict += "  ❌ REGRESSION"
+                    regressions.append(key)
+            print(f"  {name:<26} {statistics.median(seconds_list) * 1000:10.2f} ms  {results[key]:9.3f} units{verdict}")
+
+    if args.update_baseline:
+        merged = dict(baseline, **results)
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'unit': 'calibration loops (see calibrate())', 'rounds': rounds, 'results': merged},
+                      f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\n💾 Baseline updated: {os.path.relpath(BASELINE_FILE, PROJECT_ROOT)}")
+        return 0
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) slower than {args.tolerance}x baseline:")
+        for key in regressions:
+            print(f"   {key}")
+        return 1
+    print("\n✅ No regressions" if baseline else "\n⚠️ No baseline yet - run with --update-baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -58,6 +58,7 @@ run_test "Trip Data Integrity" "tests/test-trip-data.sh"
 run_test "Mobile Responsive" "tests/test-mobile.sh"
 run_test "SEO & Accessibility" "tests/test-seo.sh"
 run_test "Performance" "tests/test-performance.sh"
+run_test "Review Payload Parsing" "tests/test_review_payloads.py"
 
 # Final Summary
 echo ""
@@ -163,6 +163,32 @@ else
     warn "CSS could be minified (${CSS_LINES} lines)"
 fi
 
+# Trip Manager data layer against the committed baseline (small catalogs keep this quick)
+echo ""
+echo "Benchmarking the Trip Manager data layer..."
+if python3 -c "import tkinter" 2>/dev/null; then
+    if python3 tests/benchmark-trip-manager.py --sizes 50,500; then
+        pass "Trip Manager benchmarks within baseline"
+    else
+        fail "Trip Manager benchmarks regressed (see above)"
+    fi
+else
+    warn "Skipped Trip Manager benchmarks (python3 with tkinter not available)"
+fi
+
+# Scraper extraction on the offline Google Maps fixture (no network)
+echo ""
+echo "Benchmarking review extraction on the saved fixture..."
+if python3 -c "import playwright, playwright_stealth" 2>/dev/null; then
+    if python3 tests/benchmark-scraper.py --runs 5; then
+        pass "Review extraction works on the offline fixture"
+    else
+        fail "Review extraction failed on the offline fixture (see above)"
+    fi
+else
+    warn "Skipped scraper benchmark (playwright not installed)"
+fi
+
 echo ""
 echo "=============================================="
 echo "📊 PERFORMANCE TEST SUMMARY"
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Unit tests for review_payloads.py (the scraper's review XHR parser).
+
+The payloads under test are the review responses in
+tests/fixtures/google-maps/session.har. They are checked against
+reviews.html, the DOM snapshot from the same recording, so the index
+paths in REVIEW_PAYLOAD_LAYOUTS are confirmed by the page itself rather
+than by values written into this file. Re-recording the fixture with
+`scrape_google_reviews.py --record` needs no change here. fixture.json
+says whether the committed recording is synthetic.
+
+Usage:
+    python3 tests/test_review_payloads.py
+"""
+
+import asyncio
+import base64
+import json
+import os
+import sys
+import unittest
+from html.parser import HTMLParser
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+FIXTURE_DIR = os.path.join(TESTS_DIR, "fixtures", "google-maps")
+
+sys.path.insert(0, PROJECT_ROOT)
+from review_payloads import (REVIEW_PAYLOAD_LAYOUTS, ReviewResponseParser, dig, is_review_response,
+                             parse_review_payload)
+
+
+def har_text(content):
+    """Response body of a HAR entry; recordings may store it base64-encoded."""
+    text = content.get('text', '')
+    return base64.b64decode(text).decode('utf-8') if content.get('encoding') == 'base64' else text
+
+
+def review_responses():
+    """(url, body) of every review response in session.har."""
+    with open(os.path.join(FIXTURE_DIR, 'session.har'), 'r', encoding='utf-8') as f:
+        entries = json.load(f)['log']['entries']
+    return [(entry['request']['url'], har_text(entry['response']['content'])) for entry in entries
+            if is_review_response(entry['request']['url'])]
+
+
+class DomReviews(HTMLParser):
+    """Reviewer names, review ids and star ratings in the DOM snapshot."""
+
+    def __init__(self):
+        super().__init__()
+        self.names, self.ratings = set(), {}
+        self._review_id = None
+        self._in_name = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if attrs.get('data-review-id'):
+            self._review_id = attrs['data-review-id']
+        if 'd4r55' in classes:
+            self._in_name = True
+        label = attrs.get('aria-label') or ''
+        if self._review_id and attrs.get('role') == 'img' and label[:1].isdigit() and 'star' in label:
+            self.ratings.setdefault(self._review_id, int(label[0]))
+
+    def handle_endtag(self, tag):
+        self._in_name = False
+
+    def handle_data(self, data):
+        if self._in_name and data.strip():
+            self.names.add(data.strip())
+
+
+class FakeResponse:
+    def __init__(self, url, body):
+        self.url, self.body = url, body
+
+    async def text(self):
+        return self.body
+
+
+class ParseReviewPayloadTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.responses = review_responses()
+        with open(os.path.join(FIXTURE_DIR, 'reviews.html'), 'r', encoding='utf-8') as f:
+            cls.dom = DomReviews()
+            cls.dom.feed(f.read())
+
+    def test_har_has_review_responses(self):
+        self.assertTrue(self.responses, "session.har has no review responses")
+        self.assertTrue(self.dom.names, "reviews.html has no reviewer names")
+
+    def test_recorded_payloads_match_the_dom(self):
+        reviews = [review for _, body in self.responses for review in parse_review_payload(body)]
+        self.assertTrue(reviews, "no review response in session.har matches REVIEW_PAYLOAD_LAYOUTS")
+        for review in reviews:
+            self.assertIn(review['name'], self.dom.names)
+            if review.get('review_id') in self.dom.ratings:
+                self.assertEqual(review['rating'], self.dom.ratings[review['review_id']], review['name'])
+        # The ids must be the page's own; a wrong index path yields some other string
+        matched = [review for review in reviews if review.get('review_id') in self.dom.ratings]
+        self.assertTrue(matched, "no payload review_id appears in the DOM snapshot")
+
+    def test_recorded_payloads_have_well_formed_fields(self):
+        for _, body in self.responses:
+            for review in parse_review_payload(body):
+                self.assertTrue(review.get('date'), review['name'])
+                if 'published_at' in review:
+                    self.assertRegex(review['published_at'], r'^20\d\d-\d\d-\d\dT')
+                if 'reviewer_photo' in review:
+                    self.assertTrue(review['reviewer_photo'].startswith('https://'), review['reviewer_photo'])
+
+    def test_entries_that_fit_no_layout_are_skipped(self):
+        url, body = next((url, body) for url, body in self.responses if parse_review_payload(body))
+        prefix, payload = body.split('\n', 1)
+        data = json.loads(payload)
+        entries = next(dig(data, layout['list']) for layout in REVIEW_PAYLOAD_LAYOUTS
+                       if isinstance(dig(data, layout['list']), list))
+        count = len(parse_review_payload(body))
+        entries[:0] = [[['not', 'a review']], None, 'x']
+        self.assertEqual(len(parse_review_payload(prefix + '\n' + json.dumps(data))), count, url)
+
+    def test_older_listentitiesreviews_layout(self):
+        entry = [[None, 'Ravi K', '//lh3.googleusercontent.com/a/ravi=s120'], '2 months ago', None,
+                 'Great trek', 4] + [None] * 5 + ['review-9'] + [None] * 16 + [1760000000000]
+        reviews = parse_review_payload(")]}'\n" + json.dumps([None, None, [entry]]))
+        self.assertEqual(reviews, [{
+            'name': 'Ravi K', 'rating': 4, 'text': 'Great trek', 'date': '2 months ago',
+            'reviewer_photo': 'https://lh3.googleusercontent.com/a/ravi=s120', 'review_id': 'review-9',
+            'published_at': '2025-10-09T08:53:20+00:00',
+        }])
+
+    def test_unknown_shapes_give_no_reviews(self):
+        for body in ('', 'not json', ")]}'\n{}", '[1, 2, 3]', json.dumps([None, None, [[['x', 'y']]]])):
+            self.assertEqual(parse_review_payload(body), [], body)
+
+    def test_response_parser_dedupes_and_counts(self):
+        url, body = next((url, body) for url, body in self.responses if parse_review_payload(body))
+        parser = ReviewResponseParser(limit=3)
+        for response in (FakeResponse(url, body), FakeResponse(url, body), FakeResponse(url, 'oops'),
+                         FakeResponse('https://www.google.com/maps/vt?pb=tile', body)):
+            asyncio.run(parser._on_response(response))
+        self.assertEqual(parser.responses, 3)
+        self.assertEqual(parser.unparsed, 1)
+        self.assertEqual(len(parser.reviews), len(parse_review_payload(body)))
+        self.assertTrue(parser.has_enough())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ const {
     getUpcomingDateRanges,
     getTripDateTags,
     buildUpcomingBatches,
+    selectUpcomingBatches,
     renderTripDateTags
 } = require('../js/trip-date-utils.js');
 
@@ -131,6 +132,28 @@ test('groups active trips into normalized upcoming batches', () => {
     assert.equal(batches[1].dateLabel, 'AUG 21–23, 2026');
 });
 
+test('keeps precomputed batches that have not ended, up to the limit', () => {
+    const batch = (key, start, end) => ({
+        key,
+        start: Date.UTC(2026, 7, start),
+        end: Date.UTC(2026, 7, end),
+        trips: []
+    });
+    const precomputed = [
+        batch('ended', 7, 9),
+        batch('running', 9, 11),
+        batch('next', 14, 16),
+        batch('later', 21, 23),
+        batch('last', 28, 30)
+    ];
+
+    assert.deepEqual(
+        selectUpcomingBatches(precomputed, referenceDate, 3).map(item => item.key),
+        ['running', 'next', 'later']
+    );
+    assert.deepEqual(selectUpcomingBatches(undefined, referenceDate, 3), []);
+});
+
 test('renders accessible date tags without changing booking URLs', () => {
     const html = renderTripDateTags({
         id: 'coorg',